@@ -9,45 +9,465 @@
 3. http://localhost:5000 접속
 """
 
-from flask import Flask, jsonify, request, send_from_directory, send_file
+import time
+_MODULE_LOAD_STARTED = time.perf_counter()
+
+from flask import Flask, jsonify, request, send_from_directory, send_file, Response, g
 from flask_cors import CORS
-import requests
-from bs4 import BeautifulSoup
 import re
 import os
 import json
-import time
+import atexit
+import base64
+import zlib
+import hashlib
+import importlib
+import math
+import threading
+import contextvars
+import sqlite3
 import urllib.parse
+import sys
+import functools
+import hmac
+import tracemalloc
+import contextlib
+import tempfile
+from array import array
+from collections import deque
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeout
+
+# =====================================================
+# 무거운 의존성 지연 로딩 (requests, bs4, pytrends/pandas)
+# - gunicorn 마스터에서는 gunicorn.conf.py가 preload_heavy_modules()로 미리 import (워커는 fork로 공유)
+# - 그 외(개발 서버, 정적 페이지만 처리하는 워커)에는 처음 쓸 때 import
+# =====================================================
+IMPORT_TIMINGS = {}  # 모듈명 -> import 소요 시간 (ms)
+PRELOAD_MODULES = [name for name in os.environ.get(
+    'PRELOAD_MODULES', 'requests,bs4,pytrends.request'
+).split(',') if name.strip()]
+
+def timed_import(name):
+    """모듈 import (최초 import 시간 기록)"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMINGS.setdefault(name, round((time.perf_counter() - started) * 1000, 1))
+    return module
+
+
+class LazyModule:
+    """첫 속성 접근 시 import되는 모듈 프록시"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = timed_import(self._name)
+        return getattr(self._module, attr)
+
+
+requests = LazyModule('requests')
+
+def BeautifulSoup(*args, **kwargs):
+    with trace_span('parse'):
+        return timed_import('bs4').BeautifulSoup(*args, **kwargs)
+
+def preload_heavy_modules():
+    """PRELOAD_MODULES 미리 import (실패한 모듈은 요청 시 다시 시도)"""
+    for name in PRELOAD_MODULES:
+        try:
+            timed_import(name.strip())
+        except Exception as e:
+            print(f"Preload error ({name}): {e}")
+
+# =====================================================
+# 운영 지표 (Prometheus 텍스트 형식, /metrics)
+# - 워커마다 메모리에 모으고 METRICS_DIR/worker-<pid>.json 으로 주기적으로 기록
+# - /metrics는 디렉터리의 모든 워커 파일을 합산 (카운터/히스토그램은 합, 게이지는 살아있는 워커별)
+# =====================================================
+METRICS_DIR = os.environ.get('METRICS_DIR') or os.path.join(tempfile.gettempdir(), 'blog_analyzer_metrics')
+METRICS_FLUSH_INTERVAL = 10  # 초
+METRICS_GAUGE_MAX_AGE = 60  # 이보다 오래 갱신 안 된 워커 파일의 게이지는 제외 (종료된 워커)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')  # 설정 시 Authorization: Bearer 필요
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+class Metrics:
+    """워커 프로세스 단위 카운터/히스토그램 + 수집 시점에 계산하는 게이지"""
+
+    def __init__(self):
+        self.counters = {}  # (이름, 라벨) -> 값
+        self.histograms = {}  # (이름, 라벨) -> [버킷별 개수..., 합계, 개수]
+        self.gauges = []  # (이름, fn) - fn()은 [(라벨 dict, 값)]
+        self.help = {}  # 이름 -> (종류, 설명)
+        self._lock = threading.Lock()
+
+    def describe(self, name, kind, text):
+        self.help[name] = (kind, text)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            values = self.histograms.get(key)
+            if values is None:
+                values = self.histograms[key] = [0] * (len(LATENCY_BUCKETS) + 2)
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    values[i] += 1
+            values[-2] += seconds
+            values[-1] += 1
+
+    def gauge(self, name, text, fn):
+        self.describe(name, 'gauge', text)
+        self.gauges.append((name, fn))
+
+    def snapshot(self):
+        with self._lock:
+            counters = [[name, dict(labels), value] for (name, labels), value in self.counters.items()]
+            histograms = [[name, dict(labels), list(values)] for (name, labels), values in self.histograms.items()]
+        gauges = []
+        for name, fn in self.gauges:
+            try:
+                gauges.extend([name, labels, value] for labels, value in fn())
+            except Exception as e:
+                print(f"Metrics gauge error ({name}): {e}")
+        return {'pid': os.getpid(), 'written_at': time.time(), 'counters': counters, 'histograms': histograms, 'gauges': gauges}
+
+    def flush(self):
+        """이 워커의 지표를 공유 디렉터리에 기록 (원자적 교체)"""
+        snapshot = self.snapshot()
+        try:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            path = os.path.join(METRICS_DIR, f'worker-{os.getpid()}.json')
+            with open(path + '.tmp', 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(path + '.tmp', path)
+        except Exception as e:
+            print(f"Metrics flush error: {e}")
+        return snapshot
+
+metrics = Metrics()
+metrics.describe('blog_analyzer_http_request_seconds', 'histogram', 'API 응답 시간')
+metrics.describe('blog_analyzer_http_requests_total', 'counter', 'API 요청 수 (상태 코드별)')
+metrics.describe('blog_analyzer_stage_seconds', 'histogram', '크롤링/분석 단계별 소요 시간')
+metrics.describe('blog_analyzer_analysis_seconds', 'histogram', '분석 1회 전체 소요 시간 (모드별)')
+metrics.describe('blog_analyzer_analysis_slow_total', 'counter', '모드별 목표 시간(target_ms)을 넘긴 분석 수')
+metrics.describe('blog_analyzer_upstream_requests_total', 'counter', '네이버 요청 수 (호스트/상태 코드별)')
+metrics.describe('blog_analyzer_upstream_request_seconds', 'histogram', '네이버 요청 응답 시간 (호스트별)')
+metrics.describe('blog_analyzer_cache_requests_total', 'counter', '캐시 조회 수 (hit/stale/miss)')
+metrics.describe('blog_analyzer_supabase_requests_total', 'counter', 'Supabase 요청 수 (상태 코드별)')
+metrics.describe('blog_analyzer_supabase_request_seconds', 'histogram', 'Supabase 요청 응답 시간')
+
+# 요청 단위 추적 (/api/analyze의 Server-Timing 헤더, debug=trace 응답)
+# - 추적 중인 요청에서만 span을 만들고, 포스팅 작업/헤지 요청은 복사된 컨텍스트로 부모 span을 이어받음
+_current_trace = contextvars.ContextVar('trace', default=None)
+_current_span = contextvars.ContextVar('trace_span', default=None)
+
+class Trace:
+    """span 트리 - span: {name, start_ms, duration_ms, (속성), children}"""
+
+    def __init__(self, name):
+        self.started = time.perf_counter()
+        self.root = {'name': name, 'start_ms': 0.0, 'duration_ms': None, 'children': []}
+        self._lock = threading.Lock()
+
+    def _elapsed_ms(self):
+        return round((time.perf_counter() - self.started) * 1000, 1)
+
+    def start(self, name, parent, attrs):
+        span = {'name': name, 'start_ms': self._elapsed_ms(), 'duration_ms': None, **attrs, 'children': []}
+        with self._lock:
+            (parent or self.root)['children'].append(span)
+        return span
+
+    def finish(self, span):
+        span['duration_ms'] = round(self._elapsed_ms() - span['start_ms'], 1)
+
+    def annotate(self, span, attrs):
+        with self._lock:
+            (span or self.root).update(attrs)
+
+    def mark_cache(self, span, cache, result):
+        with self._lock:
+            (span or self.root).setdefault('cache', {})[cache] = result
+
+    def tree(self):
+        def copy(span):
+            return {**span, 'children': [copy(child) for child in span['children']]}
+        with self._lock:
+            return copy(self.root)
+
+    def server_timing(self):
+        """Server-Timing 헤더 - 같은 이름의 span은 합산 (병렬 작업은 겹쳐서 합계가 전체보다 클 수 있음)"""
+        totals = {}
+        def walk(span):
+            for child in span['children']:
+                total, count = totals.get(child['name'], (0.0, 0))
+                totals[child['name']] = (total + (child['duration_ms'] or 0), count + 1)
+                walk(child)
+        with self._lock:
+            walk(self.root)
+            cache = self.root.get('cache', {})
+        entries = [f'cache;desc="{name}={value}"' for name, value in cache.items()]
+        for name, (total, count) in totals.items():
+            entries.append(f'{name};dur={total:.1f}' + (f';desc="{count}x"' if count > 1 else ''))
+        entries.append(f'total;dur={self._elapsed_ms():.1f}')
+        return ', '.join(entries)
+
+@contextlib.contextmanager
+def start_trace(name):
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.finish(trace.root)
+        _current_trace.reset(token)
+
+@contextlib.contextmanager
+def trace_span(name, **attrs):
+    """추적 중이면 현재 span 아래에 자식 span 생성 (아니면 아무것도 안 함)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    span = trace.start(name, _current_span.get(), attrs)
+    token = _current_span.set(span)
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+        trace.finish(span)
+
+def annotate_span(**attrs):
+    """현재 span에 속성 추가 (추적 중이 아니면 무시)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.annotate(_current_span.get(), attrs)
+
+def cache_lookup(cache, result):
+    """캐시 조회 결과 기록 - result: hit / stale / miss"""
+    metrics.inc('blog_analyzer_cache_requests_total', cache=cache, result=result)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.mark_cache(_current_span.get(), cache, result)
+
+@contextlib.contextmanager
+def stage_timer(name):
+    """단계 소요 시간 측정 (추적 중이면 span도 기록)"""
+    started = time.perf_counter()
+    try:
+        with trace_span(name):
+            yield
+    finally:
+        metrics.observe('blog_analyzer_stage_seconds', time.perf_counter() - started, stage=name)
+
+def timed_stage(name):
+    """함수 전체를 한 단계로 측정하는 데코레이터"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def collect_metrics():
+    """모든 워커 파일 합산 - 디렉터리를 못 쓰면 이 워커 값만"""
+    snapshots = {}
+    try:
+        for filename in os.listdir(METRICS_DIR):
+            if filename.startswith('worker-') and filename.endswith('.json'):
+                try:
+                    with open(os.path.join(METRICS_DIR, filename)) as f:
+                        snapshot = json.load(f)
+                    snapshots[snapshot['pid']] = snapshot
+                except (OSError, ValueError, KeyError):
+                    continue
+    except OSError:
+        pass
+    own = metrics.flush()
+    snapshots[own['pid']] = own
+
+    counters, histograms, gauges = {}, {}, []
+    now = time.time()
+    for snapshot in snapshots.values():
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(sorted(labels.items())))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, values in snapshot['histograms']:
+            key = (name, tuple(sorted(labels.items())))
+            total = histograms.setdefault(key, [0] * len(values))
+            for i, value in enumerate(values):
+                total[i] += value
+        if now - snapshot['written_at'] < METRICS_GAUGE_MAX_AGE:
+            for name, labels, value in snapshot['gauges']:
+                gauges.append((name, tuple(sorted({**labels, 'pid': str(snapshot['pid'])}.items())), value))
+    return counters, histograms, gauges, len(snapshots)
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+def render_metrics():
+    """Prometheus 텍스트 형식 (0.0.4)"""
+    counters, histograms, gauges, workers = collect_metrics()
+    lines = []
+    described = set()
+
+    def header(name):
+        if name not in described and name in metrics.help:
+            kind, text = metrics.help[name]
+            lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} {kind}')
+        described.add(name)
+
+    for (name, labels), value in sorted(counters.items()):
+        header(name)
+        lines.append(f'{name}{_format_labels(labels)} {value}')
+    for (name, labels), values in sorted(histograms.items()):
+        header(name)
+        for bound, count in zip(LATENCY_BUCKETS, values):
+            lines.append(f'{name}_bucket{_format_labels(labels + (("le", str(bound)),))} {count}')
+        lines.append(f'{name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {values[-1]}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {round(values[-2], 6)}')
+        lines.append(f'{name}_count{_format_labels(labels)} {values[-1]}')
+    for name, labels, value in sorted(gauges, key=lambda item: (item[0], item[1])):
+        header(name)
+        lines.append(f'{name}{_format_labels(labels)} {value}')
+    lines.append('# TYPE blog_analyzer_workers gauge')
+    lines.append(f'blog_analyzer_workers {workers}')
+    return '\n'.join(lines) + '\n'
+
+def reset_metrics_dir():
+    """이전 실행의 워커 파일 삭제 (gunicorn 마스터 시작 시)"""
+    try:
+        for filename in os.listdir(METRICS_DIR):
+            if filename.startswith('worker-'):
+                os.remove(os.path.join(METRICS_DIR, filename))
+    except OSError:
+        pass
+
+def _metrics_flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        metrics.flush()
 
 # Supabase 연동 (REST API 직접 호출 방식)
 SUPABASE_URL = os.environ.get('SUPABASE_URL', 'https://xmkhsiscudfsqejqtkaf.supabase.co')
 SUPABASE_KEY = os.environ.get('SUPABASE_KEY', '')
 
-# 분석 결과 캐시 (5분간 유지)
+# 분석 결과 캐시 (5분간 유지, 만료 후 CACHE_MAX_STALE 동안은 갱신 중 임시 응답용으로 보관)
 CACHE = {}
 CACHE_TTL = 300  # 5분
-
-def get_cached(blog_id):
-    """캐시에서 분석 결과 조회"""
-    if blog_id in CACHE:
-        cached_data, cached_time = CACHE[blog_id]
-        if time.time() - cached_time < CACHE_TTL:
-            return cached_data
-        else:
-            del CACHE[blog_id]
-    return None
+CACHE_MAX_STALE = int(os.environ.get('CACHE_MAX_STALE', 1800))  # 30분
+PARTIAL_CACHE_TTL = 60  # 일부 단계가 빠진 결과 - 빨리 만료시켜 다시 크롤링
+CACHE_MAX_ENTRIES = 100  # 메모리 캐시 최대 항목 수 (나머지는 디스크 캐시)
+
+def cache_ttl(data):
+    """분석 결과의 신선 기간 (partial이면 PARTIAL_CACHE_TTL)"""
+    return PARTIAL_CACHE_TTL if data.get('partial') else CACHE_TTL
+
+def get_cached_with_age(blog_id, max_stale=0):
+    """캐시에서 분석 결과와 경과 시간 조회 - 만료 후 max_stale초까지 반환 (메모리에 없으면 디스크 캐시)"""
+    entry = CACHE.get(blog_id)
+    if entry is None and crawl_disk_cache:
+        data, stored_at = crawl_disk_cache.get(f'analyze:{blog_id}')
+        if data is not None:
+            if time.time() - stored_at >= cache_ttl(data) + CACHE_MAX_STALE:
+                # 더 쓸 수 없는 항목 - 매번 다시 읽어 압축을 풀지 않도록 디스크에서도 삭제
+                crawl_disk_cache.delete(f'analyze:{blog_id}')
+                return None, None
+            entry = (data, stored_at)
+            _remember_cache(blog_id, entry)
+    if entry:
+        cached_data, cached_time = entry
+        age = time.time() - cached_time
+        if age < cache_ttl(cached_data) + max_stale:
+            return cached_data, age
+        if age >= cache_ttl(cached_data) + CACHE_MAX_STALE:
+            CACHE.pop(blog_id, None)
+    return None, None
+
+def get_cache_fresh_for(blog_id):
+    """캐시 항목이 만료될 때까지 남은 시간 (초, 이미 만료면 음수) - 없으면 None"""
+    entry = CACHE.get(blog_id)
+    return cache_ttl(entry[0]) - (time.time() - entry[1]) if entry else None
+
+def _remember_cache(blog_id, entry):
+    """메모리 캐시에 저장 - 크기 제한 (최대 CACHE_MAX_ENTRIES개, 오래된 것부터 삭제)"""
+    CACHE[blog_id] = entry
+    if len(CACHE) > CACHE_MAX_ENTRIES:
+        oldest_key = min(CACHE.keys(), key=lambda k: CACHE[k][1])
+        CACHE.pop(oldest_key, None)
 
 def set_cache(blog_id, data):
-    """분석 결과를 캐시에 저장"""
-    CACHE[blog_id] = (data, time.time())
-    # 캐시 크기 제한 (최대 100개)
-    if len(CACHE) > 100:
-        oldest_key = min(CACHE.keys(), key=lambda k: CACHE[k][1])
-        del CACHE[oldest_key]
+    """분석 결과를 캐시에 저장 (디스크 캐시에도 기록)"""
+    entry = (data, time.time())
+    _remember_cache(blog_id, entry)
+    if crawl_disk_cache:
+        crawl_disk_cache.set(f'analyze:{blog_id}', data, entry[1])
+
+# 없는/비공개/잘못된 블로그 ID 캐시 (짧게 유지 - 반복 요청 시 네이버 요청 없이 바로 응답)
+UNAVAILABLE_CACHE = {}
+UNAVAILABLE_CACHE_TTL = int(os.environ.get('UNAVAILABLE_CACHE_TTL', 600))  # 10분
+UNAVAILABLE_MESSAGES = {
+    'invalid': '올바른 블로그 ID가 아닙니다.',
+    'not_found': '존재하지 않는 블로그입니다. 블로그 ID를 확인해주세요.',
+    'private': '비공개 블로그이거나 접근이 제한된 블로그입니다.',
+}
+
+def get_unavailable(blog_id):
+    """없는/비공개 블로그로 기록돼 있으면 사유 반환 (메모리에 없으면 디스크 캐시)"""
+    entry = UNAVAILABLE_CACHE.get(blog_id)
+    if entry is None and crawl_disk_cache:
+        reason, stored_at = crawl_disk_cache.get(f'unavailable:{blog_id}')
+        if reason is not None:
+            entry = UNAVAILABLE_CACHE[blog_id] = (reason, stored_at)
+    if entry:
+        reason, stored_at = entry
+        if time.time() - stored_at < UNAVAILABLE_CACHE_TTL:
+            cache_lookup('unavailable', 'hit')
+            return reason
+        UNAVAILABLE_CACHE.pop(blog_id, None)
+    cache_lookup('unavailable', 'miss')
+    return None
 
-def supabase_request(method, table, data=None, params=None):
+def set_unavailable(blog_id, reason):
+    """없는/비공개 블로그 기록 (디스크 캐시에도 기록)"""
+    UNAVAILABLE_CACHE[blog_id] = (reason, time.time())
+    if crawl_disk_cache:
+        crawl_disk_cache.set(f'unavailable:{blog_id}', reason, UNAVAILABLE_CACHE[blog_id][1])
+    # 크기 제한 (최대 1000개)
+    if len(UNAVAILABLE_CACHE) > 1000:
+        oldest_key = min(UNAVAILABLE_CACHE.keys(), key=lambda k: UNAVAILABLE_CACHE[k][1])
+        del UNAVAILABLE_CACHE[oldest_key]
+
+def _supabase_http(method, table, url, **kwargs):
+    """Supabase HTTP 요청 (응답 시간/상태 코드 지표 기록)"""
+    started = time.perf_counter()
+    status = 'error'
+    try:
+        response = requests.request(method, url, timeout=10, **kwargs)
+        status = str(response.status_code)
+        return response
+    finally:
+        metrics.observe('blog_analyzer_supabase_request_seconds', time.perf_counter() - started, method=method, table=table)
+        metrics.inc('blog_analyzer_supabase_requests_total', method=method, table=table, status=status)
+
+def supabase_request(method, table, data=None, params=None, prefer='return=representation'):
     """Supabase REST API 직접 호출"""
     if not SUPABASE_KEY:
         return None
@@ -57,17 +477,20 @@ def supabase_request(method, table, data=None, params=None):
         'apikey': SUPABASE_KEY,
         'Authorization': f'Bearer {SUPABASE_KEY}',
         'Content-Type': 'application/json',
-        'Prefer': 'return=representation'
+        'Prefer': prefer
     }
 
     try:
         if method == 'GET':
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-        elif method == 'POST':
-            response = requests.post(url, headers=headers, json=data, timeout=10)
+            response = _supabase_http('GET', table, url, headers=headers, params=params)
+        elif method in ('POST', 'PATCH'):
+            response = _supabase_http(method, table, url, headers=headers, params=params, json=data)
+        else:
+            raise ValueError(f'Unsupported method: {method}')
 
-        if response.status_code in [200, 201]:
-            return response.json()
+        if response.status_code in [200, 201, 204]:
+            # Prefer: return=minimal이면 본문 없음 - 성공만 표시
+            return response.json() if response.content else True
         else:
             print(f"Supabase error: {response.status_code} - {response.text}")
             return None
@@ -75,9 +498,1604 @@ def supabase_request(method, table, data=None, params=None):
         print(f"Supabase request error: {e}")
         return None
 
+def _parse_content_range(value):
+    """Content-Range 헤더("0-9/1234", "*/0")에서 전체 개수 추출"""
+    if not value or '/' not in value:
+        return None
+    total = value.rsplit('/', 1)[1]
+    return int(total) if total.isdigit() else None
+
+def supabase_count(table, params=None, count='exact'):
+    """Supabase 행 개수 조회 (HEAD + Prefer: count, 본문 전송 없음)"""
+    if not SUPABASE_KEY:
+        return None
+
+    url = f"{SUPABASE_URL}/rest/v1/{table}"
+    headers = {
+        'apikey': SUPABASE_KEY,
+        'Authorization': f'Bearer {SUPABASE_KEY}',
+        'Prefer': f'count={count}',
+        'Range-Unit': 'items',
+        'Range': '0-0'
+    }
+    query = {'select': 'id', **(params or {})}
+
+    try:
+        response = _supabase_http('HEAD', table, url, headers=headers, params=query)
+        if response.status_code in [200, 206]:
+            return _parse_content_range(response.headers.get('Content-Range'))
+        print(f"Supabase count error: {response.status_code}")
+        return None
+    except Exception as e:
+        print(f"Supabase count error: {e}")
+        return None
+
+def supabase_select_with_count(table, params=None, count='exact'):
+    """Supabase 조회 + 전체 개수를 한 번의 요청으로 (Content-Range) - (rows, total) 반환"""
+    if not SUPABASE_KEY:
+        return None, None
+
+    url = f"{SUPABASE_URL}/rest/v1/{table}"
+    headers = {
+        'apikey': SUPABASE_KEY,
+        'Authorization': f'Bearer {SUPABASE_KEY}',
+        'Prefer': f'count={count}'
+    }
+
+    try:
+        response = _supabase_http('GET', table, url, headers=headers, params=params)
+        if response.status_code in [200, 206]:
+            return response.json(), _parse_content_range(response.headers.get('Content-Range'))
+        print(f"Supabase error: {response.status_code} - {response.text}")
+        return None, None
+    except Exception as e:
+        print(f"Supabase request error: {e}")
+        return None, None
+
+# =====================================================
+# 저장소 (Supabase REST / 로컬 SQLite)
+# =====================================================
+HISTORY_RECENT_FIELDS = ('blog_id', 'blog_name', 'index_grade', 'daily_visitors', 'analyzed_at')
+RECENT_BLOGS_MAX_LIMIT = 100
+# 히스토리 기본 조회 필드 (시계열) - full_data는 요청 시에만 로드
+HISTORY_SERIES_FIELDS = ('id', 'blog_id', 'blog_name', 'daily_visitors', 'total_posts', 'neighbors',
+                         'index_score', 'index_grade', 'analyzed_at')
+
+# full_data 압축 포맷: "z1:" + base64(zlib(JSON))
+# - s: 숫자 스냅샷, m: 블로그 메타, index: 지수 결과
+# - posts: 포스트 목록 (컬럼 배열, logNo 기준 중복 제거, 설명 제외) - 앞의 recent_count개가 recent_posts
+# - metrics: posts_with_index 지표 (컬럼 배열, posts 인덱스 참조)
+HISTORY_FORMAT_PREFIX = 'z1:'
+HISTORY_SNAPSHOT_FIELDS = ('daily_visitors', 'yesterday_visitors', 'total_visitors', 'neighbors',
+                           'mutual_neighbors', 'total_posts', 'total_scraps', 'recent_30days_posts',
+                           'blog_age_days')
+HISTORY_META_FIELDS = ('blog_name', 'blog_nickname', 'profile_image', 'crawled_at')
+HISTORY_POST_METRICS = ('likes', 'comments', 'images', 'char_count', 'word_count', 'subheading_count',
+                        'link_count', 'has_video', 'exposure', 'keyword')
+
+def _post_log_no(link):
+    match = re.search(r'/(\d{10,})', link or '') or re.search(r'logNo=(\d+)', link or '')
+    return match.group(1) if match else None
+
+def encode_history_payload(analysis_data):
+    """분석 결과를 압축 히스토리 포맷으로 변환"""
+    blog_id = analysis_data.get('blog_id', '')
+
+    posts = {'log_no': [], 'title': [], 'date': [], 'link': []}
+    post_index = {}
+
+    def add_post(post):
+        link = post.get('link', '')
+        key = _post_log_no(link) or link
+        if key in post_index:
+            return post_index[key]
+        log_no = _post_log_no(link)
+        post_index[key] = len(posts['log_no'])
+        posts['log_no'].append(log_no)
+        posts['title'].append(post.get('title', ''))
+        posts['date'].append(post.get('date', ''))
+        # 표준 링크(blog.naver.com/{blog_id}/{logNo})는 복원 가능하므로 저장하지 않음
+        posts['link'].append(None if log_no and f'blog.naver.com/{blog_id}/{log_no}' in link else link)
+        return post_index[key]
+
+    for post in analysis_data.get('recent_posts') or []:
+        add_post(post)
+    recent_count = len(posts['log_no'])
+
+    metrics = {'ref': [], **{field: [] for field in HISTORY_POST_METRICS}}
+    for post in analysis_data.get('posts_with_index') or []:
+        metrics['ref'].append(add_post(post))
+        for field in HISTORY_POST_METRICS:
+            metrics[field].append(post.get(field))
+
+    compact = {
+        'v': 1,
+        's': {field: analysis_data.get(field, 0) for field in HISTORY_SNAPSHOT_FIELDS},
+        'm': {field: analysis_data.get(field) for field in HISTORY_META_FIELDS},
+        'index': analysis_data.get('index') or {},
+        'posts': posts,
+        'recent_count': recent_count,
+        'metrics': metrics
+    }
+    raw = json.dumps(compact, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return HISTORY_FORMAT_PREFIX + base64.b64encode(zlib.compress(raw, 9)).decode('ascii')
+
+def decode_history_payload(blog_id, full_data):
+    """압축 히스토리 포맷 복원 (이전 JSON 텍스트 포맷도 지원)"""
+    if not full_data:
+        return None
+    if not full_data.startswith(HISTORY_FORMAT_PREFIX):
+        return json.loads(full_data)
+
+    compact = json.loads(zlib.decompress(base64.b64decode(full_data[len(HISTORY_FORMAT_PREFIX):])))
+    posts = compact['posts']
+
+    def restore_post(i):
+        log_no = posts['log_no'][i]
+        link = posts['link'][i] or f'https://blog.naver.com/{blog_id}/{log_no}'
+        return {'title': posts['title'][i], 'link': link, 'date': posts['date'][i]}
+
+    metrics = compact['metrics']
+    posts_with_index = []
+    for row, ref in enumerate(metrics['ref']):
+        post = restore_post(ref)
+        for field in HISTORY_POST_METRICS:
+            post[field] = metrics[field][row]
+        posts_with_index.append(post)
+
+    return {
+        'blog_id': blog_id,
+        **compact['m'],
+        **compact['s'],
+        'index': compact['index'],
+        'recent_posts': [restore_post(i) for i in range(compact['recent_count'])],
+        'posts_with_index': posts_with_index
+    }
+
+
+class SupabaseStorage:
+    """Supabase REST API 저장소
+
+    blog_latest (블로그별 최신 분석 1건) 테이블:
+        create table blog_latest (
+            blog_id text primary key, blog_name text, index_grade text,
+            daily_visitors integer, analyzed_at timestamptz not null
+        );
+        create index blog_latest_analyzed_at on blog_latest (analyzed_at desc);
+
+    visitor_series (블로그별 일별 방문자 수) 테이블:
+        create table visitor_series (
+            blog_id text primary key, base_day integer not null,
+            counts text not null, updated_at timestamptz
+        );
+    """
+    name = 'supabase'
+
+    def available(self):
+        return bool(SUPABASE_KEY)
+
+    # ----- 분석 히스토리 -----
+    def save_history(self, record):
+        result = supabase_request('POST', 'blog_history', data=record)
+        if not result:
+            return None
+        # 블로그별 최신 분석 갱신 - 없으면 INSERT, 있으면 더 최신일 때만 PATCH (동시 저장 시 뒤로 돌아가지 않음)
+        latest = {field: record.get(field) for field in HISTORY_RECENT_FIELDS}
+        inserted = supabase_request('POST', 'blog_latest', data=latest, params={'on_conflict': 'blog_id'},
+                                    prefer='resolution=ignore-duplicates,return=representation')
+        if not inserted:
+            supabase_request('PATCH', 'blog_latest', data=latest, params={
+                'blog_id': f'eq.{latest["blog_id"]}',
+                'analyzed_at': f'lte.{latest["analyzed_at"]}'
+            }, prefer='return=minimal')
+        return result[0] if isinstance(result, list) else result
+
+    def recent_blogs(self, limit=10):
+        """최근 분석된 블로그 (블로그당 1건) - blog_latest 테이블이 없으면 None"""
+        return supabase_request('GET', 'blog_latest', params={
+            'select': ','.join(HISTORY_RECENT_FIELDS),
+            'order': 'analyzed_at.desc',
+            'limit': str(limit)
+        })
+
+    def get_history(self, blog_id, limit=30, fields=None):
+        return supabase_request('GET', 'blog_history', params={
+            'select': ','.join(fields) if fields else '*',
+            'blog_id': f'eq.{blog_id}',
+            'order': 'analyzed_at.desc',
+            'limit': str(limit)
+        })
+
+    def recent_history(self, limit=50):
+        return supabase_request('GET', 'blog_history', params={
+            'select': ','.join(HISTORY_RECENT_FIELDS),
+            'order': 'analyzed_at.desc',
+            'limit': str(limit)
+        })
+
+    def count_history(self):
+        return supabase_count('blog_history')
+
+    def scan_history_blog_ids(self, after_id, limit):
+        return supabase_request('GET', 'blog_history', params={
+            'select': 'id,blog_id',
+            'id': f'gt.{after_id}',
+            'order': 'id.asc',
+            'limit': str(limit)
+        })
+
+    # ----- 커뮤니티 -----
+    def list_posts(self, category, limit, offset=0, cursor=None, count=None):
+        """게시글 목록 (created_at, id 역순) - (rows, total) 반환, count가 없으면 total은 None"""
+        params = {
+            'select': '*',
+            'order': 'created_at.desc,id.desc',
+            'limit': str(limit)
+        }
+
+        if category != 'all':
+            params['category'] = f'eq.{category}'
+
+        if cursor:
+            # keyset 페이지네이션: 마지막 게시글 이후부터 (offset 스캔 없음)
+            created_at, last_id = cursor
+            params['or'] = f'(created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{last_id}))'
+        else:
+            params['offset'] = str(offset)
+
+        if count:
+            return supabase_select_with_count('community_posts', params=params, count=count)
+        return supabase_request('GET', 'community_posts', params=params), None
+
+    def create_post(self, post_data):
+        result = supabase_request('POST', 'community_posts', data=post_data)
+        if result:
+            return result[0] if isinstance(result, list) else result
+        return None
+
+    def get_post(self, post_id):
+        result = supabase_request('GET', 'community_posts', params={'select': '*', 'id': f'eq.{post_id}'})
+        if result:
+            return result[0]
+        return None
+
+    def get_post_likes(self, post_id):
+        result = supabase_request('GET', 'community_posts', params={'select': 'likes', 'id': f'eq.{post_id}'})
+        if result:
+            return result[0].get('likes') or 0
+        return None
+
+    # ----- 방문자 시계열 -----
+    def get_visitor_series(self, blog_id):
+        """(base_day, counts bytes) 또는 None"""
+        result = supabase_request('GET', 'visitor_series', params={
+            'select': 'base_day,counts', 'blog_id': f'eq.{blog_id}'
+        })
+        if result:
+            return result[0]['base_day'], base64.b64decode(result[0]['counts'])
+        return None
+
+    def merge_visitor_points(self, blog_id, points):
+        """기존 시계열에 points 병합 - counts=eq.{기존값} 조건부 PATCH (행이 없으면 INSERT)로 동시 갱신 유실 방지"""
+        for _ in range(SERIES_CAS_RETRIES):
+            stored = self.get_visitor_series(blog_id)
+            series = VisitorSeries.from_bytes(*stored) if stored else VisitorSeries()
+            apply_visitor_points(series, points)
+            row = {
+                'base_day': series.base_day,
+                'counts': base64.b64encode(series.to_bytes()).decode('ascii'),
+                'updated_at': datetime.now().isoformat()
+            }
+            if stored:
+                updated = supabase_request('PATCH', 'visitor_series', data=row, params={
+                    'blog_id': f'eq.{blog_id}',
+                    'base_day': f'eq.{stored[0]}',
+                    'counts': f'eq.{base64.b64encode(stored[1]).decode("ascii")}'
+                })
+            else:
+                # 다른 워커가 먼저 INSERT하면 충돌(409)로 None - 재시도 시 PATCH로 병합
+                updated = supabase_request('POST', 'visitor_series', data={'blog_id': blog_id, **row})
+            if updated:
+                return
+            # 다른 워커가 먼저 갱신함 - 최신 값으로 재시도
+
+        raise RuntimeError(f'visitor series update conflict ({blog_id})')
+
+    def increment_post_likes(self, post_id, delta, expected=None):
+        """likes=eq.{기존값} 조건부 PATCH로 원자적 증가 - 반영된 값 반환 (게시글 없으면 None)"""
+        current = expected
+        for _ in range(LIKE_CAS_RETRIES):
+            if current is None:
+                current = self.get_post_likes(post_id)
+                if current is None:
+                    return None
+            updated = supabase_request('PATCH', 'community_posts', data={'likes': current + delta},
+                                       params={'id': f'eq.{post_id}', 'likes': f'eq.{current}'})
+            if updated:
+                return updated[0].get('likes', current + delta)
+            # 다른 워커가 먼저 갱신함 - 최신 값으로 재시도
+            current = None
+
+        raise RuntimeError(f'like update conflict (post {post_id})')
+
+
+class SQLiteDatabase:
+    """SQLite 파일 공통 처리 - 스레드별 연결 (WAL 모드), 프로세스별 1회 스키마 생성"""
+    SCHEMA = ""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_pid = None
+
+    def _conn(self):
+        """스레드별 연결 (fork 이후에는 새로 연결)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=5000')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._ensure_schema(conn)
+        return conn
+
+    def _ensure_schema(self, conn):
+        with self._schema_lock:
+            if self._schema_pid != os.getpid():
+                conn.executescript(self.SCHEMA)
+                self._migrate(conn)
+                self._schema_pid = os.getpid()
+
+    def _migrate(self, conn):
+        """스키마 생성 직후 추가 작업 (하위 클래스에서 정의)"""
+
+    def _query(self, sql, args=()):
+        return [dict(row) for row in self._conn().execute(sql, args).fetchall()]
+
+
+class SQLiteStorage(SQLiteDatabase):
+    """로컬 SQLite 저장소 (WAL 모드) - Supabase 없이 실행하거나 오프라인 테스트용"""
+    name = 'sqlite'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS blog_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            blog_id TEXT NOT NULL,
+            blog_name TEXT,
+            daily_visitors INTEGER DEFAULT 0,
+            total_posts INTEGER DEFAULT 0,
+            neighbors INTEGER DEFAULT 0,
+            index_score REAL DEFAULT 0,
+            index_grade TEXT,
+            analyzed_at TEXT NOT NULL,
+            full_data TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_blog_history_blog_analyzed ON blog_history (blog_id, analyzed_at);
+        CREATE INDEX IF NOT EXISTS idx_blog_history_analyzed ON blog_history (analyzed_at);
+
+        CREATE TABLE IF NOT EXISTS blog_latest (
+            blog_id TEXT PRIMARY KEY,
+            blog_name TEXT,
+            index_grade TEXT,
+            daily_visitors INTEGER DEFAULT 0,
+            analyzed_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_blog_latest_analyzed ON blog_latest (analyzed_at);
+
+        CREATE TABLE IF NOT EXISTS visitor_series (
+            blog_id TEXT PRIMARY KEY,
+            base_day INTEGER NOT NULL,
+            counts BLOB NOT NULL,
+            updated_at TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS community_posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nickname TEXT,
+            category TEXT,
+            title TEXT,
+            content TEXT,
+            likes INTEGER DEFAULT 0,
+            comments INTEGER DEFAULT 0,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_community_posts_category_created ON community_posts (category, created_at, id);
+        CREATE INDEX IF NOT EXISTS idx_community_posts_created ON community_posts (created_at, id);
+    """
+
+    def available(self):
+        return True
+
+    def _migrate(self, conn):
+        # blog_latest 도입 이전 데이터 1회 채움
+        if not conn.execute('SELECT 1 FROM blog_latest LIMIT 1').fetchone():
+            conn.execute("""
+                INSERT OR IGNORE INTO blog_latest (blog_id, blog_name, index_grade, daily_visitors, analyzed_at)
+                SELECT blog_id, blog_name, index_grade, daily_visitors, MAX(analyzed_at)
+                FROM blog_history GROUP BY blog_id
+            """)
+
+    def _insert(self, table, record):
+        columns = ', '.join(record)
+        placeholders = ', '.join('?' for _ in record)
+        cursor = self._conn().execute(
+            f'INSERT INTO {table} ({columns}) VALUES ({placeholders})', tuple(record.values())
+        )
+        rows = self._query(f'SELECT * FROM {table} WHERE id = ?', (cursor.lastrowid,))
+        return rows[0] if rows else None
+
+    # ----- 분석 히스토리 -----
+    def save_history(self, record):
+        saved = self._insert('blog_history', record)
+        self._conn().execute("""
+            INSERT INTO blog_latest (blog_id, blog_name, index_grade, daily_visitors, analyzed_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (blog_id) DO UPDATE SET
+                blog_name = excluded.blog_name, index_grade = excluded.index_grade,
+                daily_visitors = excluded.daily_visitors, analyzed_at = excluded.analyzed_at
+            WHERE excluded.analyzed_at >= blog_latest.analyzed_at
+        """, tuple(record.get(field) for field in HISTORY_RECENT_FIELDS))
+        return saved
+
+    def recent_blogs(self, limit=10):
+        return self._query(
+            f'SELECT {", ".join(HISTORY_RECENT_FIELDS)} FROM blog_latest ORDER BY analyzed_at DESC LIMIT ?',
+            (limit,)
+        )
+
+    def get_history(self, blog_id, limit=30, fields=None):
+        columns = ', '.join(fields) if fields else '*'
+        return self._query(
+            f'SELECT {columns} FROM blog_history WHERE blog_id = ? ORDER BY analyzed_at DESC LIMIT ?',
+            (blog_id, limit)
+        )
+
+    def recent_history(self, limit=50):
+        return self._query(
+            f'SELECT {", ".join(HISTORY_RECENT_FIELDS)} FROM blog_history ORDER BY analyzed_at DESC LIMIT ?',
+            (limit,)
+        )
+
+    def count_history(self):
+        return self._conn().execute('SELECT COUNT(*) FROM blog_history').fetchone()[0]
+
+    def scan_history_blog_ids(self, after_id, limit):
+        return self._query(
+            'SELECT id, blog_id FROM blog_history WHERE id > ? ORDER BY id LIMIT ?',
+            (after_id, limit)
+        )
+
+    # ----- 커뮤니티 -----
+    def list_posts(self, category, limit, offset=0, cursor=None, count=None):
+        where, args = [], []
+        if category != 'all':
+            where.append('category = ?')
+            args.append(category)
+
+        total = None
+        if count:
+            where_sql = f'WHERE {" AND ".join(where)}' if where else ''
+            total = self._conn().execute(f'SELECT COUNT(*) FROM community_posts {where_sql}', args).fetchone()[0]
+
+        if cursor:
+            created_at, last_id = cursor
+            where.append('(created_at < ? OR (created_at = ? AND id < ?))')
+            args.extend([created_at, created_at, last_id])
+
+        where_sql = f'WHERE {" AND ".join(where)}' if where else ''
+        rows = self._query(
+            f'SELECT * FROM community_posts {where_sql} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?',
+            (*args, limit, 0 if cursor else offset)
+        )
+        return rows, total
+
+    def create_post(self, post_data):
+        return self._insert('community_posts', {
+            **post_data,
+            'created_at': datetime.now().astimezone().isoformat()
+        })
+
+    def get_post(self, post_id):
+        rows = self._query('SELECT * FROM community_posts WHERE id = ?', (post_id,))
+        return rows[0] if rows else None
+
+    def get_post_likes(self, post_id):
+        row = self._conn().execute('SELECT likes FROM community_posts WHERE id = ?', (post_id,)).fetchone()
+        return (row[0] or 0) if row else None
+
+    # ----- 방문자 시계열 -----
+    def get_visitor_series(self, blog_id):
+        row = self._conn().execute(
+            'SELECT base_day, counts FROM visitor_series WHERE blog_id = ?', (blog_id,)
+        ).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def merge_visitor_points(self, blog_id, points):
+        # BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡아 읽기-병합-쓰기 사이에 다른 워커가 끼어들지 못함
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            stored = self.get_visitor_series(blog_id)
+            series = VisitorSeries.from_bytes(*stored) if stored else VisitorSeries()
+            apply_visitor_points(series, points)
+            conn.execute(
+                'INSERT OR REPLACE INTO visitor_series (blog_id, base_day, counts, updated_at) VALUES (?, ?, ?, ?)',
+                (blog_id, series.base_day, series.to_bytes(), datetime.now().isoformat())
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def increment_post_likes(self, post_id, delta, expected=None):
+        row = self._conn().execute(
+            'UPDATE community_posts SET likes = COALESCE(likes, 0) + ? WHERE id = ? RETURNING likes',
+            (delta, post_id)
+        ).fetchone()
+        return row[0] if row else None
+
+
+def create_storage():
+    """STORAGE_BACKEND(supabase | sqlite) 선택 - 미지정 시 SUPABASE_KEY가 없으면 SQLite 사용"""
+    backend = os.environ.get('STORAGE_BACKEND', '').lower() or ('supabase' if SUPABASE_KEY else 'sqlite')
+    if backend == 'sqlite':
+        default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blog_analyzer.db')
+        return SQLiteStorage(os.environ.get('SQLITE_PATH', default_path))
+    return SupabaseStorage()
+
+storage = create_storage()
+
+
+class DiskCache(SQLiteDatabase):
+    """크롤링 결과 디스크 캐시 (메모리 캐시 아래 계층) - 재시작/배포 후에도 유지
+
+    값은 zlib 압축 JSON, 쓰기 DISK_CACHE_COMPACT_EVERY회마다 오래된 항목 정리 + 용량 제한
+    """
+    SCHEMA = """
+        PRAGMA auto_vacuum = INCREMENTAL;
+        CREATE TABLE IF NOT EXISTS crawl_cache (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            stored_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_crawl_cache_stored ON crawl_cache (stored_at);
+    """
+
+    def __init__(self, path, max_bytes, max_age):
+        super().__init__(path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._writes = 0
+
+    def get(self, key):
+        """(value, stored_at) - 없으면 (None, None)"""
+        try:
+            row = self._conn().execute(
+                'SELECT value, stored_at FROM crawl_cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row and time.time() - row[1] < self.max_age:
+                cache_lookup('disk', 'hit')
+                return json.loads(zlib.decompress(row[0])), row[1]
+        except Exception as e:
+            print(f"Disk cache read error: {e}")
+        cache_lookup('disk', 'miss')
+        return None, None
+
+    def set(self, key, value, stored_at=None):
+        try:
+            blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+            self._conn().execute(
+                'INSERT OR REPLACE INTO crawl_cache (key, value, size, stored_at) VALUES (?, ?, ?, ?)',
+                (key, blob, len(blob), stored_at or time.time())
+            )
+            self._writes += 1
+            if self._writes % DISK_CACHE_COMPACT_EVERY == 0:
+                self.compact()
+        except Exception as e:
+            print(f"Disk cache write error: {e}")
+
+    def delete(self, key):
+        try:
+            self._conn().execute('DELETE FROM crawl_cache WHERE key = ?', (key,))
+        except Exception as e:
+            print(f"Disk cache delete error: {e}")
+
+    def compact(self):
+        """만료 항목 삭제 → 용량 초과 시 오래된 순으로 80%까지 삭제 → 빈 페이지 반환"""
+        conn = self._conn()
+        conn.execute('DELETE FROM crawl_cache WHERE stored_at < ?', (time.time() - self.max_age,))
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM crawl_cache').fetchone()[0]
+        if total > self.max_bytes:
+            target = total - int(self.max_bytes * 0.8)
+            cutoff = conn.execute("""
+                SELECT stored_at FROM (
+                    SELECT stored_at, SUM(size) OVER (ORDER BY stored_at) AS running FROM crawl_cache
+                ) WHERE running >= ? ORDER BY stored_at LIMIT 1
+            """, (target,)).fetchone()
+            if cutoff:
+                conn.execute('DELETE FROM crawl_cache WHERE stored_at <= ?', (cutoff[0],))
+        conn.execute('PRAGMA incremental_vacuum')
+
+
+# 디스크 캐시 (CRAWL_CACHE_PATH를 빈 값으로 두면 사용 안 함)
+DISK_CACHE_MAX_BYTES = int(os.environ.get('CRAWL_CACHE_MAX_MB', 64)) * 1024 * 1024
+DISK_CACHE_MAX_AGE = 86400  # 1일
+DISK_CACHE_COMPACT_EVERY = 200
+POST_DETAIL_TTL = 3600  # 포스팅 상세 (공감/댓글/본문 분석) 1시간
+
+_crawl_cache_path = os.environ.get(
+    'CRAWL_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crawl_cache.db')
+)
+crawl_disk_cache = DiskCache(_crawl_cache_path, DISK_CACHE_MAX_BYTES, DISK_CACHE_MAX_AGE) if _crawl_cache_path else None
+
+# =====================================================
+# 방문자 시계열 (블로그별 일별 방문자 수)
+# =====================================================
+SERIES_MAX_DAYS = 400
+SERIES_MISSING = 0xFFFFFFFF  # 데이터 없는 날
+
+
+class VisitorSeries:
+    """일별 방문자 수 고정폭 배열 (uint32, 하루 4바이트) - base_day는 첫 칸의 날짜 (date ordinal)"""
+
+    def __init__(self, base_day=0, counts=None):
+        self.base_day = base_day
+        self.counts = counts if counts is not None else array('I')
+
+    @classmethod
+    def from_bytes(cls, base_day, data):
+        counts = array('I')
+        counts.frombytes(data)
+        if sys.byteorder == 'big':
+            counts.byteswap()
+        return cls(base_day, counts)
+
+    def to_bytes(self):
+        counts = array('I', self.counts)
+        if sys.byteorder == 'big':
+            counts.byteswap()
+        return counts.tobytes()
+
+    def get(self, day):
+        i = day - self.base_day
+        if 0 <= i < len(self.counts) and self.counts[i] != SERIES_MISSING:
+            return self.counts[i]
+        return None
+
+    def record(self, day, visitors, keep_max=False):
+        """day의 방문자 수 기록 (keep_max: 진행 중인 날은 더 큰 값 유지)"""
+        if not self.counts:
+            self.base_day = day
+        if day < self.base_day:
+            if self.base_day - day + len(self.counts) > SERIES_MAX_DAYS:
+                return
+            self.counts = array('I', [SERIES_MISSING] * (self.base_day - day)) + self.counts
+            self.base_day = day
+
+        i = day - self.base_day
+        if i >= len(self.counts):
+            self.counts.extend([SERIES_MISSING] * (i - len(self.counts) + 1))
+        if keep_max and self.counts[i] != SERIES_MISSING:
+            visitors = max(visitors, self.counts[i])
+        self.counts[i] = min(visitors, SERIES_MISSING - 1)
+
+        # 보관 기간을 넘은 날짜 제거
+        overflow = len(self.counts) - SERIES_MAX_DAYS
+        if overflow > 0:
+            del self.counts[:overflow]
+            self.base_day += overflow
+
+    def rollup(self, end_day, days):
+        """end_day 직전 days일 평균 (end_day 제외) - (평균, 데이터 있는 일수)"""
+        values = [v for v in (self.get(d) for d in range(end_day - days, end_day)) if v is not None]
+        if not values:
+            return 0, 0
+        return round(sum(values) / len(values)), len(values)
+
+
+def _today_ordinal():
+    return datetime.now().date().toordinal()
+
+def load_visitor_series(blog_id):
+    stored = storage.get_visitor_series(blog_id) if storage.available() else None
+    if stored:
+        return VisitorSeries.from_bytes(*stored)
+    return VisitorSeries()
+
+def visitor_rollups(series, today=None):
+    """7일/30일 평균 (당일 제외 - 완료된 날만)"""
+    today = today or _today_ordinal()
+    avg_7d, days_7d = series.rollup(today, 7)
+    avg_30d, days_30d = series.rollup(today, 30)
+    return {'avg_7d': avg_7d, 'days_7d': days_7d, 'avg_30d': avg_30d, 'days_30d': days_30d}
+
+def apply_visitor_points(series, points):
+    """(day, visitors, keep_max) 목록을 시계열에 반영"""
+    for day, visitors, keep_max in points:
+        series.record(day, visitors, keep_max=keep_max)
+
+# 크롤링 중 시계열 읽기는 전용 스레드에서 - 분석 deadline(최대 SERIES_READ_TIMEOUT초)까지만 기다림
+SERIES_READ_TIMEOUT = 2
+SERIES_CAS_RETRIES = 3
+_series_executor = {'pid': None, 'executor': None}
+
+def _get_series_executor():
+    # fork 이후 워커마다 새로 생성
+    with _background_lock:
+        if _series_executor['pid'] != os.getpid():
+            _series_executor['executor'] = ThreadPoolExecutor(max_workers=2, thread_name_prefix='series')
+            _series_executor['pid'] = os.getpid()
+        return _series_executor['executor']
+
+def _load_visitor_series_capped(blog_id):
+    """deadline 안에 읽히면 시계열, 아니면 None (읽기 작업은 백그라운드에서 마저 끝남)"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return load_visitor_series(blog_id)
+    future = _get_series_executor().submit(load_visitor_series, blog_id)
+    try:
+        return future.result(timeout=min(SERIES_READ_TIMEOUT, deadline.remaining()))
+    except FutureTimeout:
+        print(f"Visitor series read timed out: {blog_id}")
+        return None
+
+def record_visitor_stats(blog_id, result):
+    """크롤링 결과(어제/오늘 방문자)를 시계열에 반영하고 평균 반환
+
+    저장은 백그라운드에서 병합 방식(merge_visitor_points)으로 - 크롤링을 막지 않고, 같은 블로그를
+    동시에 크롤링한 워커끼리 서로의 기록을 덮어쓰지 않음
+    """
+    today = _today_ordinal()
+    # 어제 방문자는 확정값, 오늘 방문자는 진행 중이므로 최대값 유지 (0은 수집 실패로 보고 제외)
+    points = []
+    if result.get('yesterday_visitors', 0) > 0:
+        points.append((today - 1, result['yesterday_visitors'], False))
+    if result.get('daily_visitors', 0) > 0:
+        points.append((today, result['daily_visitors'], True))
+
+    if points and storage.available():
+        run_in_background(f'series:{blog_id}', storage.merge_visitor_points, blog_id, points)
+
+    try:
+        series = _load_visitor_series_capped(blog_id)
+    except Exception as e:
+        print(f"Visitor series error: {e}")
+        series = None
+    if series is None:
+        return {'avg_7d': 0, 'days_7d': 0, 'avg_30d': 0, 'days_30d': 0}
+    apply_visitor_points(series, points)
+    return visitor_rollups(series, today)
+
+# 백그라운드 작업 (같은 이름의 작업은 동시에 하나만 실행)
+_background_lock = threading.Lock()
+_background_running = set()
+
+# 네이버 요청 우선순위 - 사용자 요청 처리 중이면 interactive, 백그라운드 스레드에서는 background
+# (새 스레드는 컨텍스트를 물려받지 않으므로 백그라운드 진입점에서 직접 설정)
+request_priority = contextvars.ContextVar('request_priority', default='interactive')
+
+def run_in_background(name, target, *args):
+    """데몬 스레드로 작업 실행 (네이버 요청은 background 우선순위) - 이미 실행 중이면 False 반환"""
+    with _background_lock:
+        if name in _background_running:
+            return False
+        _background_running.add(name)
+
+    def runner():
+        request_priority.set('background')
+        try:
+            target(*args)
+        except Exception as e:
+            print(f"Background task error ({name}): {e}")
+        finally:
+            with _background_lock:
+                _background_running.discard(name)
+
+    threading.Thread(target=runner, name=f'bg-{name}', daemon=True).start()
+    return True
+
+def _run_as_background(target):
+    request_priority.set('background')
+    target()
+
+# 워커 프로세스별 상주 스레드 (gunicorn fork 이후 최초 사용 시 시작, 죽으면 재시작)
+_worker_threads = {}
+
+def ensure_worker_thread(name, target):
+    thread = _worker_threads.get(name)
+    if thread is None or not thread.is_alive():
+        with _background_lock:
+            thread = _worker_threads.get(name)
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(target=_run_as_background, args=(target,), name=name, daemon=True)
+                thread.start()
+                _worker_threads[name] = thread
+    return thread
+
+
+class TokenBucket:
+    """토큰 버킷 - 분당 per_minute개씩 채워지고 최대 capacity개까지 쌓임"""
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60
+        self.capacity = float(capacity if capacity is not None else per_minute)
+        self.tokens = self.capacity
+        self.updated = time.time()
+        self._lock = threading.Lock()
+
+    def take(self, cost=1):
+        """예산 차감 - 부족하면 False"""
+        now = time.time()
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < cost:
+                return False
+            self.tokens -= cost
+            return True
+
+    def retry_after(self, cost=1):
+        """cost만큼 쌓일 때까지 남은 시간 (초)"""
+        with self._lock:
+            missing = cost - min(self.capacity, self.tokens + (time.time() - self.updated) * self.rate)
+        return max(0.0, missing / self.rate) if self.rate else float('inf')
+
+
+class SWRCache:
+    """읽기 캐시 (stale-while-revalidate)
+
+    - fresh_ttl 이내: 캐시 값 그대로 반환
+    - stale_ttl 이내: 캐시 값을 즉시 반환하고 백그라운드에서 갱신
+    - 그 이후 / 없음: loader를 호출해 채움 (None이면 저장하지 않음)
+    """
+
+    def __init__(self, name, fresh_ttl, stale_ttl, max_entries=200):
+        self.name = name
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = {}  # key -> (value, loaded_at)
+        self._generation = 0  # 무효화될 때마다 증가 - 진행 중이던 갱신 결과는 버림
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generation
+
+        if entry:
+            value, loaded_at = entry
+            age = time.time() - loaded_at
+            if age < self.fresh_ttl:
+                cache_lookup(self.name, 'hit')
+                return value
+            if age < self.stale_ttl:
+                cache_lookup(self.name, 'stale')
+                run_in_background(f'{self.name}:{key}', self._reload, key, loader, generation)
+                return value
+
+        cache_lookup(self.name, 'miss')
+        return self._reload(key, loader, generation)
+
+    def _reload(self, key, loader, generation):
+        value = loader()
+        if value is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        self._entries[key] = (value, time.time())
+        if len(self._entries) > self.max_entries:
+            oldest_key = min(self._entries, key=lambda k: self._entries[k][1])
+            del self._entries[oldest_key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def invalidate(self, key=None):
+        """key 하나 또는 전체 무효화"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._generation += 1
+
+    def update_values(self, fn):
+        """캐시된 값을 제자리 갱신 - fn(key, value)가 새 값을 반환 (None이면 유지)"""
+        with self._lock:
+            for key, (value, loaded_at) in list(self._entries.items()):
+                new_value = fn(key, value)
+                if new_value is not None:
+                    self._entries[key] = (new_value, loaded_at)
+
+
+class HyperLogLog:
+    """고유 값 개수 추정용 HyperLogLog 스케치 (p=12: 4KB, 표준오차 약 1.6%)"""
+
+    def __init__(self, p=12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(self.m)
+        self.alpha = 0.7213 / (1 + 1.079 / self.m)
+
+    def add(self, value):
+        h = int.from_bytes(hashlib.sha1(str(value).encode('utf-8')).digest()[:8], 'big')
+        idx = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def count(self):
+        estimate = self.alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        # 소규모 보정 (linear counting)
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+
+# 전체 통계 (총 분석 수, 고유 블로그 수) - 메모리 스냅샷 + 주기적 증분 갱신
+STATS_REFRESH_INTERVAL = 60  # 1분
+STATS_SCAN_PAGE_SIZE = 1000
+STATS_SCAN_MAX_PAGES = 20  # 갱신 1회당 최대 스캔 페이지 (초기 적재는 여러 번에 나눠 진행)
+
+_stats_lock = threading.Lock()
+_stats_init_lock = threading.Lock()
+_stats = {
+    'total_analyses': 0,
+    'sketch': HyperLogLog(),
+    'last_id': 0,         # 스케치에 반영된 마지막 blog_history.id (keyset 커서)
+    'scan_complete': False,
+    'refreshed_at': 0,
+}
+
+STATS_SKETCH_KEY = 'stats:sketch'  # 디스크 캐시에 스케치 보관 - 재시작 후 처음부터 다시 스캔하지 않음
+
+def _load_stats_sketch():
+    """디스크 캐시에 저장된 스케치/커서 복원 (없으면 False)"""
+    if crawl_disk_cache is None:
+        return False
+    saved, _ = crawl_disk_cache.get(STATS_SKETCH_KEY)
+    if not saved:
+        return False
+    try:
+        registers = base64.b64decode(saved['registers'])
+    except Exception as e:
+        print(f"Stats sketch load error: {e}")
+        return False
+    with _stats_lock:
+        if len(registers) != len(_stats['sketch'].registers) or saved['last_id'] <= _stats['last_id']:
+            return False
+        # 복원 전에 record_history_saved로 반영된 값도 유지 (레지스터별 최대값)
+        sketch = _stats['sketch']
+        sketch.registers = bytearray(max(a, b) for a, b in zip(sketch.registers, registers))
+        _stats['last_id'] = saved['last_id']
+        _stats['scan_complete'] = saved.get('scan_complete', False)
+    return True
+
+def _save_stats_sketch():
+    if crawl_disk_cache is None:
+        return
+    with _stats_lock:
+        saved = {
+            'registers': base64.b64encode(bytes(_stats['sketch'].registers)).decode('ascii'),
+            'last_id': _stats['last_id'],
+            'scan_complete': _stats['scan_complete'],
+        }
+    crawl_disk_cache.set(STATS_SKETCH_KEY, saved)
+
+def _refresh_total_stats():
+    """정확한 행 개수 + 신규 행만 스케치에 반영"""
+    total = storage.count_history()
+
+    with _stats_lock:
+        last_id = _stats['last_id']
+
+    scan_complete = False
+    for _ in range(STATS_SCAN_MAX_PAGES):
+        rows = storage.scan_history_blog_ids(last_id, STATS_SCAN_PAGE_SIZE)
+        if rows is None:
+            break
+        with _stats_lock:
+            for row in rows:
+                if row.get('blog_id'):
+                    _stats['sketch'].add(row['blog_id'])
+            if rows:
+                last_id = max(last_id, max(row.get('id', 0) for row in rows))
+                _stats['last_id'] = last_id
+        if len(rows) < STATS_SCAN_PAGE_SIZE:
+            scan_complete = True
+            break
+
+    with _stats_lock:
+        if total is not None:
+            _stats['total_analyses'] = total
+        _stats['scan_complete'] = scan_complete
+        _stats['refreshed_at'] = time.time()
+    _save_stats_sketch()
+
+def _init_total_stats():
+    """최초 요청 시 - 저장된 스케치 복원 + 행 개수만 동기 조회 (스캔은 백그라운드)"""
+    _load_stats_sketch()
+    total = storage.count_history()
+    with _stats_lock:
+        if total is not None:
+            _stats['total_analyses'] = total
+        # 스캔이 끝나기 전까지는 approximate
+        _stats['scan_complete'] = False
+        _stats['refreshed_at'] = time.time()
+
+def get_total_stats_snapshot():
+    """캐시된 통계 반환 - 최초 1회는 행 개수만 동기 조회, 스케치 스캔은 항상 백그라운드"""
+    if _stats['refreshed_at'] == 0:
+        with _stats_init_lock:
+            if _stats['refreshed_at'] == 0:
+                _init_total_stats()
+        run_in_background('total_stats', _refresh_total_stats)
+    elif time.time() - _stats['refreshed_at'] > STATS_REFRESH_INTERVAL:
+        run_in_background('total_stats', _refresh_total_stats)
+
+    with _stats_lock:
+        return {
+            'total_analyses': _stats['total_analyses'],
+            'unique_blogs': _stats['sketch'].count(),
+            # unique_blogs는 항상 HyperLogLog 추정값 (표준오차 약 1.6%) - 스캔 완료 여부는 별도 표시
+            'approximate': True,
+            'scan_complete': _stats['scan_complete'],
+            'updated_at': datetime.fromtimestamp(_stats['refreshed_at']).isoformat()
+        }
+
+def record_history_saved(blog_id):
+    """저장 직후 스냅샷에 즉시 반영 (다음 갱신 시 정확한 값으로 보정)"""
+    with _stats_lock:
+        _stats['total_analyses'] += 1
+        _stats['sketch'].add(blog_id)
+
 app = Flask(__name__, static_folder='static')
 CORS(app)
 
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+    ensure_worker_thread('metrics-writer', _metrics_flush_loop)
+
+SERVER_TIMING_ENDPOINTS = {'analyze_blog'}
+
+@app.after_request
+def _record_request_metrics(response):
+    """라우트별 응답 시간/상태 코드 기록 (매칭되지 않은 경로는 제외)"""
+    started = g.get('request_started')
+    if started is not None and request.url_rule is not None:
+        endpoint = request.url_rule.rule
+        metrics.observe('blog_analyzer_http_request_seconds', time.perf_counter() - started, endpoint=endpoint, method=request.method)
+        metrics.inc('blog_analyzer_http_requests_total', endpoint=endpoint, method=request.method, status=str(response.status_code))
+    # /api/analyze는 추적 전에 끝난 응답(400 검증 실패, 429 요청 제한)에도 Server-Timing 포함
+    if started is not None and request.endpoint in SERVER_TIMING_ENDPOINTS and 'Server-Timing' not in response.headers:
+        response.headers['Server-Timing'] = f'total;dur={(time.perf_counter() - started) * 1000:.1f}'
+    return response
+
+# =====================================================
+# API 요청 제한 (클라이언트별 토큰 버킷 + 무거운 API 동시 실행 제한)
+# - 클라이언트: 발급된 X-API-Key(API_KEYS)면 키, 아니면 IP
+#   (X-Forwarded-For는 클라이언트가 앞쪽을 꾸밀 수 있으므로 신뢰하는 프록시가 덧붙인 뒤에서 TRUSTED_PROXY_HOPS번째 항목)
+# - 워커 프로세스별 상태 - 실제 허용량은 워커 수만큼 여유 있음
+# =====================================================
+API_KEYS = {key.strip() for key in os.environ.get('API_KEYS', '').split(',') if key.strip()}
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', 1))  # 앞단 프록시 수 (Render: 1, 프록시 없음: 0)
+ADMISSION_BUDGETS = {  # 등급 -> (분당 요청 수, 최대 연속 요청 수)
+    'cheap': (int(os.environ.get('CHEAP_REQUESTS_PER_MIN', 120)), int(os.environ.get('CHEAP_REQUESTS_BURST', 60))),
+    'expensive': (int(os.environ.get('EXPENSIVE_REQUESTS_PER_MIN', 12)), int(os.environ.get('EXPENSIVE_REQUESTS_BURST', 6))),
+}
+# 네이버 크롤링 동시 실행 수 (워커당) - 캐시 응답은 제한 없음, 실제 크롤링만 슬롯 사용
+EXPENSIVE_MAX_CONCURRENT = int(os.environ.get('EXPENSIVE_MAX_CONCURRENT', 2))
+EXPENSIVE_MAX_QUEUE = int(os.environ.get('EXPENSIVE_MAX_QUEUE', 2))  # 대기 가능한 요청 수 - 넘으면 바로 429
+ADMISSION_MAX_CLIENTS = 5000
+
+_admission_lock = threading.Lock()
+_client_buckets = {}  # (등급, 클라이언트) -> TokenBucket
+_expensive_slots = threading.BoundedSemaphore(EXPENSIVE_MAX_CONCURRENT)
+_expensive_waiting = [0]
+
+def client_identity():
+    """요청 제한 단위 - 발급된 API 키 또는 클라이언트 IP (모르는 키는 익명 취급)"""
+    api_key = request.headers.get('X-API-Key', '').strip()
+    if api_key and api_key in API_KEYS:
+        return 'key:' + hashlib.sha1(api_key.encode()).hexdigest()[:16]
+    return 'ip:' + client_ip()
+
+def client_ip():
+    """신뢰하는 프록시가 기록한 클라이언트 IP - 프록시가 덧붙인 항목만 사용 (앞쪽은 클라이언트가 보낸 값)"""
+    if TRUSTED_PROXY_HOPS > 0:
+        hops = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+        if len(hops) >= TRUSTED_PROXY_HOPS:
+            return hops[-TRUSTED_PROXY_HOPS]
+    return request.remote_addr or 'unknown'
+
+def _client_bucket(cost_class, client):
+    key = (cost_class, client)
+    with _admission_lock:
+        bucket = _client_buckets.pop(key, None)
+        if bucket is None:
+            per_minute, burst = ADMISSION_BUDGETS[cost_class]
+            bucket = TokenBucket(per_minute, burst)
+        _client_buckets[key] = bucket  # 최근 사용 순서 유지 (오래된 것부터 정리)
+        while len(_client_buckets) > ADMISSION_MAX_CLIENTS:
+            del _client_buckets[next(iter(_client_buckets))]
+        return bucket
+
+def too_many_requests(retry_after, reason):
+    retry_after = max(1, math.ceil(retry_after))
+    response = jsonify({'error': '요청이 너무 많습니다. 잠시 후 다시 시도해주세요.', 'reason': reason, 'retry_after': retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def admission_control(cost_class):
+    """API 요청 제한 데코레이터 - cost_class: 'cheap' 또는 'expensive' (네이버 크롤링이 필요한 API)
+
+    동시 실행 수 제한은 실제 크롤링 구간에서만 (crawl_slot) - 캐시 응답은 슬롯을 기다리지 않음
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            bucket = _client_bucket(cost_class, client_identity())
+            if not bucket.take():
+                return too_many_requests(bucket.retry_after(), 'rate_limited')
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@contextlib.contextmanager
+def crawl_slot(wait):
+    """크롤링 슬롯 (워커당 EXPENSIVE_MAX_CONCURRENT개) - 얻으면 True, 못 얻으면 False
+
+    대기열이 차 있으면 기다리지 않고 바로 False, 아니면 최대 wait초 (분석 모드의 deadline) 대기
+    """
+    with _admission_lock:
+        if _expensive_waiting[0] >= EXPENSIVE_MAX_QUEUE:
+            yield False
+            return
+        _expensive_waiting[0] += 1
+    try:
+        acquired = _expensive_slots.acquire(timeout=wait)
+    finally:
+        with _admission_lock:
+            _expensive_waiting[0] -= 1
+    if not acquired:
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        _expensive_slots.release()
+
+# =====================================================
+# 네이버 요청 공통 (분석 1회 전체에 걸친 데드라인)
+# - crawl()이 Deadline을 컨텍스트에 설정하면 그 안의 모든 요청 timeout이 남은 시간으로 제한됨
+# - 백그라운드 스레드(SWR 갱신 등)는 컨텍스트를 물려받지 않으므로 기본 timeout만 적용
+# =====================================================
+UPSTREAM_TIMEOUT = 10  # 요청 1건 기본 timeout (초)
+CRAWL_DEADLINE = float(os.environ.get('CRAWL_DEADLINE', 8))  # 분석 1회 전체 시간 (초)
+
+class DeadlineExceeded(Exception):
+    pass
+
+class Deadline:
+    """분석 1회에 주어진 시간 - 단계/포스팅 작업이 남은 시간을 나눠 씀"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def timeout(self, cap):
+        """요청 timeout = min(cap, 남은 시간) - 이미 지났으면 DeadlineExceeded"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f'deadline {self.seconds}s exceeded')
+        return min(cap, remaining)
+
+_current_deadline = contextvars.ContextVar('crawl_deadline', default=None)
+_rejected_endpoints = contextvars.ContextVar('rejected_endpoints', default=None)  # crawl() 중 차단된 엔드포인트
+
+# 엔드포인트별 서킷 브레이커 (워커 프로세스별 상태)
+BREAKER_WINDOW = 60  # 최근 몇 초의 요청으로 판단할지
+BREAKER_MIN_REQUESTS = 5  # 판단에 필요한 최소 요청 수
+BREAKER_FAILURE_RATE = 0.5  # 실패(예외/429/5xx) 또는 느린 응답 비율이 이 이상이면 차단
+BREAKER_SLOW_SECONDS = 5.0
+BREAKER_OPEN_SECONDS = 30  # 차단 후 시험 요청까지 대기
+LATENCY_SAMPLES = 200  # 엔드포인트별로 보관하는 최근 응답 시간 수 (p90 계산용)
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    """closed → (실패율 초과) open → (대기 후) half_open: 시험 요청 1건 → 성공 시 closed, 실패 시 다시 open"""
+
+    def __init__(self, name):
+        self.name = name
+        self.state = 'closed'
+        self.opened_at = 0.0
+        self.probing = False
+        self.calls = deque()  # (시각, 실패 여부, 느림 여부)
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)  # 성공 응답 시간 (초)
+        self.rejected = 0
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'open':
+                if time.time() - self.opened_at < BREAKER_OPEN_SECONDS:
+                    self.rejected += 1
+                    return False
+                self.state = 'half_open'
+            if self.state == 'half_open':
+                if self.probing:
+                    self.rejected += 1
+                    return False
+                self.probing = True
+            return True
+
+    def record(self, failed, elapsed, answered=True):
+        """요청 결과 기록 - answered=False면 응답 전에 끊긴 것 (응답 시간 표본에서 제외)"""
+        now = time.time()
+        with self._lock:
+            if self.state == 'half_open':
+                self.probing = False
+                if failed:
+                    self._open(now)
+                else:
+                    self.state = 'closed'
+                    self.calls.clear()
+                return
+
+            if answered and not failed:
+                self.latencies.append(elapsed)
+            self.calls.append((now, failed, elapsed >= BREAKER_SLOW_SECONDS))
+            while self.calls and now - self.calls[0][0] > BREAKER_WINDOW:
+                self.calls.popleft()
+            if self.state == 'closed' and len(self.calls) >= BREAKER_MIN_REQUESTS:
+                bad = sum(1 for _, f, slow in self.calls if f or slow)
+                if bad / len(self.calls) >= BREAKER_FAILURE_RATE:
+                    self._open(now)
+
+    def latency_percentile(self, q, min_samples=1):
+        """최근 성공 응답 시간의 q 분위수 (초) - 표본이 부족하면 None"""
+        with self._lock:
+            samples = sorted(self.latencies)
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+    def _open(self, now):
+        self.state = 'open'
+        self.opened_at = now
+        self.trips += 1
+        self.calls.clear()
+
+    def snapshot(self):
+        p90 = self.latency_percentile(0.9)
+        with self._lock:
+            failures = sum(1 for _, f, _ in self.calls if f)
+            slow = sum(1 for _, _, s in self.calls if s)
+            return {
+                'state': self.state,
+                'window_requests': len(self.calls),
+                'window_failures': failures,
+                'window_slow': slow,
+                'rejected': self.rejected,
+                'trips': self.trips,
+                'p90_ms': int(p90 * 1000) if p90 is not None else None,
+                'opened_at': datetime.fromtimestamp(self.opened_at).isoformat() if self.opened_at else None
+            }
+
+_breakers_lock = threading.Lock()
+_breakers = {}
+
+def upstream_endpoint(url):
+    """브레이커 단위 - 호스트 (+ .naver 로 끝나는 API 경로)"""
+    parsed = urllib.parse.urlsplit(url)
+    last = parsed.path.rstrip('/').rsplit('/', 1)[-1]
+    return f'{parsed.netloc}/{last}' if last.endswith('.naver') else parsed.netloc
+
+def get_breaker(endpoint):
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+def breaker_states():
+    """모니터링용 - 엔드포인트별 브레이커 상태"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+# 네이버 동시 요청 스케줄러 (워커당) - 엄격한 우선순위 (interactive 대기가 있으면 background는 기다림)
+UPSTREAM_MAX_CONCURRENT = int(os.environ.get('UPSTREAM_MAX_CONCURRENT', 6))
+UPSTREAM_INTERACTIVE_RESERVED = 2  # background가 쓸 수 없는 슬롯 (사용자 요청이 바로 들어갈 자리)
+UPSTREAM_PRIORITIES = ('interactive', 'background')  # 앞쪽이 우선
+UPSTREAM_QUEUE_TIMEOUT = 30  # 데드라인이 없을 때 최대 대기 (초)
+
+class UpstreamQueueTimeout(Exception):
+    pass
+
+class UpstreamScheduler:
+    """동시 요청 슬롯 분배
+
+    - 빈 슬롯은 대기 중인 가장 높은 우선순위에 배정 - interactive 대기가 있는 동안 background는 슬롯을 받지 못함
+    - background는 예약 슬롯을 제외한 남는 자리만 사용 - 사용자 요청이 새로 와도 바로 들어갈 자리가 남음
+    """
+
+    def __init__(self, capacity, priorities, reserved):
+        self.capacity = capacity
+        self.priorities = priorities
+        self.reserved = reserved
+        self.in_use = 0
+        self.queues = {name: deque() for name in priorities}
+        self.granted = {name: 0 for name in priorities}
+        self.timeouts = {name: 0 for name in priorities}
+        self._cond = threading.Condition()
+
+    def _limit(self, name):
+        return self.capacity - (self.reserved if name == 'background' else 0)
+
+    def _next_class(self):
+        """다음 슬롯을 받을 우선순위 - 슬롯이 없으면 None"""
+        for name in self.priorities:
+            if self.queues[name]:
+                # 상위 우선순위가 대기 중이면 하위는 슬롯이 비어 있어도 받지 못함
+                return name if self.in_use < self._limit(name) else None
+        return None
+
+    def acquire(self, name, timeout):
+        ticket = object()
+        expires_at = time.monotonic() + timeout
+        with self._cond:
+            queue = self.queues[name]
+            queue.append(ticket)
+            while not (queue[0] is ticket and self._next_class() == name):
+                remaining = expires_at - time.monotonic()
+                if remaining <= 0:
+                    queue.remove(ticket)
+                    self.timeouts[name] += 1
+                    self._cond.notify_all()
+                    raise UpstreamQueueTimeout(f'upstream queue wait > {timeout:.1f}s ({name})')
+                self._cond.wait(remaining)
+            queue.popleft()
+            self.in_use += 1
+            self.granted[name] += 1
+            self._cond.notify_all()
+
+    def release(self):
+        with self._cond:
+            self.in_use -= 1
+            self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                'capacity': self.capacity,
+                'in_use': self.in_use,
+                'waiting': {name: len(queue) for name, queue in self.queues.items()},
+                'granted': dict(self.granted),
+                'timeouts': dict(self.timeouts)
+            }
+
+upstream_scheduler = UpstreamScheduler(UPSTREAM_MAX_CONCURRENT, UPSTREAM_PRIORITIES, UPSTREAM_INTERACTIVE_RESERVED)
+
+def upstream_request(method, url, timeout=UPSTREAM_TIMEOUT, **kwargs):
+    """네이버 요청 공통 - 우선순위별 슬롯 대기 → 브레이커 확인 (열려 있으면 즉시 CircuitOpenError) → 요청
+
+    데드라인이 있으면 슬롯 대기와 요청 timeout 모두 남은 시간으로 제한
+    """
+    host = urllib.parse.urlsplit(url).netloc
+    deadline = _current_deadline.get()
+    wait_limit = deadline.timeout(UPSTREAM_QUEUE_TIMEOUT) if deadline is not None else UPSTREAM_QUEUE_TIMEOUT
+    try:
+        upstream_scheduler.acquire(request_priority.get(), wait_limit)
+    except UpstreamQueueTimeout:
+        metrics.inc('blog_analyzer_upstream_requests_total', host=host, status='queue_timeout')
+        raise
+    try:
+        limit = deadline.timeout(timeout) if deadline is not None else timeout
+
+        endpoint = upstream_endpoint(url)
+        breaker = get_breaker(endpoint)
+        if not breaker.allow():
+            rejected = _rejected_endpoints.get()
+            if rejected is not None:
+                rejected.add(endpoint)
+            metrics.inc('blog_analyzer_upstream_requests_total', host=host, status='circuit_open')
+            raise CircuitOpenError(f'circuit open: {endpoint}')
+
+        started = time.perf_counter()
+        try:
+            with trace_span('fetch', endpoint=endpoint):
+                response = requests.request(method, url, timeout=limit, **kwargs)
+                annotate_span(status=response.status_code)
+        except Exception as e:
+            elapsed = time.perf_counter() - started
+            # 데드라인 때문에 줄어든 timeout으로 끊긴 건 엔드포인트 실패로 보지 않음 (느린 응답으로만 집계)
+            is_timeout = isinstance(e, requests.exceptions.Timeout)
+            breaker.record(not (is_timeout and limit < timeout), elapsed, answered=False)
+            metrics.inc('blog_analyzer_upstream_requests_total', host=host, status='timeout' if is_timeout else 'error')
+            metrics.observe('blog_analyzer_upstream_request_seconds', elapsed, host=host)
+            raise
+        elapsed = time.perf_counter() - started
+        breaker.record(response.status_code == 429 or response.status_code >= 500, elapsed)
+        metrics.inc('blog_analyzer_upstream_requests_total', host=host, status=str(response.status_code))
+        metrics.observe('blog_analyzer_upstream_request_seconds', elapsed, host=host)
+        return response
+    finally:
+        upstream_scheduler.release()
+
+def upstream_get(url, headers=None, timeout=UPSTREAM_TIMEOUT, **kwargs):
+    return upstream_request('GET', url, headers=headers, timeout=timeout, **kwargs)
+
+def upstream_post(url, headers=None, timeout=UPSTREAM_TIMEOUT, **kwargs):
+    return upstream_request('POST', url, headers=headers, timeout=timeout, **kwargs)
+
+# 헤지 요청 - 응답이 엔드포인트 p90보다 늦으면 같은 요청을 한 번 더 보내 먼저 온 응답 사용
+HEDGE_ENABLED = os.environ.get('UPSTREAM_HEDGING', '1') not in ('0', 'false')
+HEDGE_PERCENTILE = 0.9
+HEDGE_MIN_SAMPLES = 20  # p90을 믿을 수 있는 최소 표본 수 (그 전에는 헤지 안 함)
+HEDGE_BUDGET_PER_MIN = int(os.environ.get('HEDGE_BUDGET_PER_MIN', 20))  # 추가 요청 한도 (워커당, 분당)
+HEDGE_MAX_WORKERS = 16
+
+_hedge_budget = TokenBucket(HEDGE_BUDGET_PER_MIN)
+_hedge_stats = {'sent': 0, 'won': 0}
+_hedge_executor = {'pid': None, 'executor': None}
+
+def _get_hedge_executor():
+    # fork 이후 워커마다 새로 생성
+    with _breakers_lock:
+        if _hedge_executor['pid'] != os.getpid():
+            _hedge_executor['executor'] = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix='hedge')
+            _hedge_executor['pid'] = os.getpid()
+        return _hedge_executor['executor']
+
+def hedged_get(url, headers=None, timeout=UPSTREAM_TIMEOUT, **kwargs):
+    """꼬리 지연이 긴 페이지용 GET - p90까지 응답이 없으면 예산 안에서 1번 더 요청"""
+    delay = get_breaker(upstream_endpoint(url)).latency_percentile(HEDGE_PERCENTILE, HEDGE_MIN_SAMPLES)
+    if not HEDGE_ENABLED or delay is None:
+        return upstream_get(url, headers=headers, timeout=timeout, **kwargs)
+
+    executor = _get_hedge_executor()
+
+    def submit():
+        return executor.submit(contextvars.copy_context().run, upstream_get, url, headers, timeout, **kwargs)
+
+    primary = submit()
+    done, _ = wait([primary], timeout=delay)
+    if done or not _hedge_budget.take():
+        return primary.result()
+
+    backup = submit()
+    with _breakers_lock:
+        _hedge_stats['sent'] += 1
+
+    pending = {primary, backup}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                response = future.result()
+            except Exception as e:
+                error = e
+                continue
+            if future is backup:
+                with _breakers_lock:
+                    _hedge_stats['won'] += 1
+            return response
+    raise error
+
+def upstream_states():
+    """모니터링용 - 엔드포인트별 브레이커/p90 + 헤지 요청 + 우선순위 스케줄러 통계"""
+    with _breakers_lock:
+        hedging = dict(_hedge_stats)
+    return {'endpoints': breaker_states(), 'hedging': hedging, 'scheduler': upstream_scheduler.snapshot()}
+
+# =====================================================
+# 네이버 블로그 검색 결과 (SERP) - 한 번 받아서 구조화 후 캐시, 노출 확인/경쟁 분석 공용
+# =====================================================
+SERP_CACHE_TTL = 600  # 10분
+SERP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Referer': 'https://blog.naver.com/',
+}
+SERP_TITLE_SELECTOR = '.api_txt_lines.total_tit, .title_link, .total_tit, .sh_blog_title'
+
+serp_cache = SWRCache('serp', fresh_ttl=SERP_CACHE_TTL, stale_ttl=SERP_CACHE_TTL, max_entries=500)
+
+# blog.naver.com/{blogId} - 뒤에 '.'이 붙는 PostView.naver 같은 페이지 경로는 제외 (부분 일치도 막음)
+BLOG_PATH_ID_PATTERN = r'blog\.naver\.com/([a-zA-Z0-9_-]+)(?![\w.-])'
+
+def parse_blog_link(link):
+    """블로그 링크에서 (blogId, logNo) 추출 - 없으면 None"""
+    match = re.search(r'blog\.naver\.com/([a-zA-Z0-9_-]+)/(\d{9,})', link)
+    if match:
+        return match.group(1), match.group(2)
+    match = re.search(r'blogId=([a-zA-Z0-9_-]+).*?logNo=(\d+)', link)
+    if match:
+        return match.group(1), match.group(2)
+    match = re.search(BLOG_PATH_ID_PATTERN, link) or re.search(r'blogId=([a-zA-Z0-9_-]+)', link)
+    if match:
+        return match.group(1), ''
+    return None
+
+@timed_stage('serp_parse')
+def parse_serp(html):
+    """검색 결과 HTML → 순위 목록 + 결과에 등장한 포스팅/블로그 전체"""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    items = []
+    seen = set()
+    for elem in soup.select(SERP_TITLE_SELECTOR):
+        link = elem.get('href', '')
+        parsed = parse_blog_link(link)
+        if not parsed or (parsed in seen):
+            continue
+        seen.add(parsed)
+        items.append({
+            'rank': len(items) + 1,
+            'blog_id': parsed[0],
+            'log_no': parsed[1],
+            'title': elem.get_text(strip=True),
+            'link': link
+        })
+
+    # 제목 외 링크/스크립트 데이터까지 포함한 (blogId, logNo) 전체
+    posts = set(re.findall(r'blog\.naver\.com/([a-zA-Z0-9_-]+)/(\d{9,})', html))
+    posts.update(re.findall(r'blogId=([a-zA-Z0-9_-]+)[^"\'\s<>]*?logNo=(\d+)', html))
+    blog_ids = set(re.findall(BLOG_PATH_ID_PATTERN, html))
+    blog_ids.update(re.findall(r'blogId=([a-zA-Z0-9_-]+)', html))
+
+    return {
+        'items': items,
+        'posts': {f'{blog_id}/{log_no}' for blog_id, log_no in posts},
+        'blog_ids': blog_ids | {item['blog_id'] for item in items}
+    }
+
+def fetch_serp(query):
+    """네이버 블로그 검색 (캐시 미스 시에만 요청) - 실패 시 None"""
+    def load():
+        search_url = f'https://search.naver.com/search.naver?where=blog&query={urllib.parse.quote(query)}'
+        response = hedged_get(search_url, headers=SERP_HEADERS)
+        if response.status_code != 200:
+            return None
+        return {'query': query, **parse_serp(response.text), 'fetched_at': datetime.now().isoformat()}
+
+    return serp_cache.get(query, load)
+
+
+# 블로그 ID 형식 (영문/숫자/-/_) 과 없는/비공개 블로그 안내 문구
+BLOG_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,50}$')
+BLOG_UNAVAILABLE_MARKERS = {
+    'not_found': ('존재하지 않는 블로그', '블로그가 존재하지 않', '존재하지 않는 아이디', '삭제되었거나 존재하지 않'),
+    'private': ('비공개 블로그', '비공개로 설정', '접근 권한이 없', '이용이 제한된 블로그'),
+}
+
+
 # 네이버 블로그 크롤러
 class NaverBlogCrawler:
     def __init__(self):
@@ -88,8 +2106,15 @@ class NaverBlogCrawler:
             'Referer': 'https://blog.naver.com/',
         }
     
-    def crawl(self, blog_id, weekly_avg=0, weekly_count=0):
-        """블로그 전체 정보 크롤링"""
+    def crawl(self, blog_id, weekly_avg=0, weekly_count=0, max_posts=5, deadline=None):
+        """블로그 전체 정보 크롤링
+
+        weekly_avg/weekly_count: 서버 시계열이 부족할 때 쓰는 클라이언트 평균
+        max_posts: 상세 분석할 포스팅 수 (0이면 포스팅 분석 생략 - 경량 크롤링)
+        deadline: 전체 시간 예산 (기본 CRAWL_DEADLINE초) - 넘기면 남은 단계는 건너뛰고
+                  끝난 부분만 반환 (result['stages']에 단계별 ok/timeout/skipped/partial/circuit_open)
+        """
+        deadline = deadline or Deadline(CRAWL_DEADLINE)
         result = {
             'blog_id': blog_id,
             'blog_name': None,
@@ -105,45 +2130,79 @@ class NaverBlogCrawler:
             'visitor_history': [],
             'blog_age_days': 0,
             'crawled_at': datetime.now().isoformat(),
+            'stages': {},
+            'partial': False,
             'error': None
         }
-        
-        try:
-            # 1. 블로그 메인 페이지 크롤링
-            self._crawl_main_page(blog_id, result)
-
-            # 2. RSS 피드로 포스팅 정보 가져오기
-            self._crawl_rss(blog_id, result)
-
-            # 3. 프로필 페이지에서 추가 정보
-            self._crawl_profile(blog_id, result)
+        stages = result['stages']
+        rejected = set()
+        token = _current_deadline.set(deadline)
+        rejected_token = _rejected_endpoints.set(rejected)
 
-            # 4. 방문자 통계 (위젯 공개 시)
-            self._crawl_visitor_stats(blog_id, result)
+        try:
+            # 0. ID 형식 확인 (네이버 요청 없이 거름)
+            if not BLOG_ID_PATTERN.match(blog_id):
+                result['unavailable'] = 'invalid'
+
+            # 1. 블로그 메인 페이지 → 2. RSS 피드 → 3. 프로필 → 4. 방문자 통계 (위젯 공개 시)
+            # → 5. 모바일 페이지 (이웃, 방문자, 포스팅 수) - 시간이 다 되면 남은 단계는 건너뜀
+            for name, stage in (
+                ('main', self._crawl_main_page),
+                ('rss', self._crawl_rss),
+                ('profile', self._crawl_profile),
+                ('visitors', self._crawl_visitor_stats),
+                ('mobile', self._crawl_mobile_page),
+            ):
+                if result.get('unavailable'):
+                    break  # 없는/비공개 블로그 - 남은 단계 생략
+                if deadline.expired():
+                    stages[name] = 'skipped'
+                    continue
+                rejected_before = len(rejected)
+                stage(blog_id, result)
+                if len(rejected) > rejected_before:
+                    stages[name] = 'circuit_open'  # 엔드포인트 차단 중 - 요청 없이 바로 건너뜀
+                else:
+                    stages[name] = 'timeout' if deadline.expired() else 'ok'
 
-            # 5. 모바일 페이지에서 추가 정보 (이웃, 방문자, 포스팅 수)
-            self._crawl_mobile_page(blog_id, result)
+            if result.get('unavailable'):
+                result['error'] = UNAVAILABLE_MESSAGES[result['unavailable']]
+                return result
 
-            # 6. 지수 계산 (주간 평균 사용)
-            result['index'] = self._calculate_index(result, weekly_avg=weekly_avg, weekly_count=weekly_count)
+            # 6. 방문자 시계열 반영 + 지수 계산 (서버 7일 평균 우선) - 네이버 요청 없음
+            result['visitor_averages'] = record_visitor_stats(blog_id, result)
+            self.apply_index(result, weekly_avg=weekly_avg, weekly_count=weekly_count)
 
-            # 7. 포스팅 지수 정보 (최근 5개)
-            if result.get('recent_posts'):
-                result['posts_with_index'] = self._get_posts_with_index(
-                    blog_id, result['recent_posts'], max_posts=5
-                )
+            # 7. 포스팅 지수 정보 (최근 max_posts개, 남은 시간 안에 끝난 것만)
+            if result.get('recent_posts') and max_posts > 0:
+                if deadline.expired():
+                    stages['posts'] = 'skipped'
+                else:
+                    result['posts_with_index'], stages['posts'] = self._get_posts_with_index(
+                        blog_id, result['recent_posts'], max_posts=max_posts, deadline=deadline
+                    )
 
         except Exception as e:
             result['error'] = str(e)
+        finally:
+            _current_deadline.reset(token)
+            _rejected_endpoints.reset(rejected_token)
 
+        result['partial'] = any(status != 'ok' for status in stages.values())
         return result
     
+    @timed_stage('main_page')
     def _crawl_main_page(self, blog_id, result):
         """블로그 메인 페이지 크롤링"""
         try:
             # iframe 내부 페이지 직접 접근 (전체글 보기)
             url = f'https://blog.naver.com/PostList.naver?blogId={blog_id}&from=postList&categoryNo=0'
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = upstream_get(url, headers=self.headers)
+
+            # 첫 응답으로 없는/비공개 블로그 판별 (이후 단계 생략)
+            if response.status_code == 404:
+                result['unavailable'] = 'not_found'
+                return
 
             if response.status_code == 200:
                 html = response.text
@@ -159,6 +2218,13 @@ class NaverBlogCrawler:
                 if post_count_match:
                     result['total_posts'] = int(post_count_match.group(1))
 
+                # 정상 블로그 정보가 하나도 없을 때만 안내 문구로 판별 (본문에 같은 문구가 있는 경우 오판 방지)
+                if not title_elem and not post_count_match:
+                    for reason, markers in BLOG_UNAVAILABLE_MARKERS.items():
+                        if any(marker in html for marker in markers):
+                            result['unavailable'] = reason
+                            return
+
                 # 활동 정보 (이웃 수 등)
                 activity_items = soup.select('.activity_item, .blog_info li')
                 for item in activity_items:
@@ -179,11 +2245,12 @@ class NaverBlogCrawler:
         except Exception as e:
             print(f"Main page crawl error: {e}")
     
+    @timed_stage('rss')
     def _crawl_rss(self, blog_id, result):
         """RSS 피드 크롤링 - 최근 30일 포스팅 수 분석 포함"""
         try:
             rss_url = f'https://rss.blog.naver.com/{blog_id}'
-            response = requests.get(rss_url, headers=self.headers, timeout=10)
+            response = upstream_get(rss_url, headers=self.headers)
 
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, 'html.parser')
@@ -277,6 +2344,7 @@ class NaverBlogCrawler:
         except Exception as e:
             print(f"RSS crawl error: {e}")
 
+    @timed_stage('post_details')
     def _get_post_details(self, blog_id, post_url):
         """개별 포스팅의 공감/댓글/이미지 수 가져오기 - 개선된 버전"""
         try:
@@ -292,12 +2360,19 @@ class NaverBlogCrawler:
             url_blog_id_match = re.search(r'blog\.naver\.com/([a-zA-Z0-9_-]+)', post_url)
             actual_blog_id = url_blog_id_match.group(1) if url_blog_id_match else blog_id
 
+            # 디스크 캐시 확인 (최근 분석한 포스팅은 재요청 생략)
+            cache_key = f'post:{actual_blog_id}/{log_no}'
+            if crawl_disk_cache:
+                cached, stored_at = crawl_disk_cache.get(cache_key)
+                if cached is not None and time.time() - stored_at < POST_DETAIL_TTL:
+                    return cached
+
             # 모바일 페이지로 접근 (더 간단한 구조)
             mobile_headers = {
                 'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1'
             }
             mobile_url = f'https://m.blog.naver.com/{actual_blog_id}/{log_no}'
-            response = requests.get(mobile_url, headers=mobile_headers, timeout=10)
+            response = hedged_get(mobile_url, headers=mobile_headers)
 
             if response.status_code != 200:
                 return {'likes': 0, 'comments': 0, 'images': 0, 'char_count': 0, 'word_count': 0, 'subheading_count': 0, 'link_count': 0, 'has_video': False, 'image_seo': {}}
@@ -444,7 +2519,7 @@ class NaverBlogCrawler:
             # 이미지 SEO 분석
             image_seo = self._analyze_image_seo(html, soup)
 
-            return {
+            details = {
                 'likes': likes,
                 'comments': comments,
                 'images': images,
@@ -455,11 +2530,15 @@ class NaverBlogCrawler:
                 'has_video': content_analysis.get('has_video', False),
                 'image_seo': image_seo
             }
+            if crawl_disk_cache:
+                crawl_disk_cache.set(cache_key, details)
+            return details
 
         except Exception as e:
             print(f"Post detail crawl error: {e}")
             return {'likes': 0, 'comments': 0, 'images': 0, 'char_count': 0, 'word_count': 0, 'subheading_count': 0, 'link_count': 0, 'has_video': False, 'image_seo': {}}
 
+    @timed_stage('content_analysis')
     def _analyze_content(self, html, soup):
         """본문 콘텐츠 분석 - 개선된 버전"""
         try:
@@ -590,6 +2669,7 @@ class NaverBlogCrawler:
             print(f"Content analysis error: {e}")
             return {'char_count': 0, 'word_count': 0, 'subheading_count': 0, 'link_count': 0, 'has_video': False}
 
+    @timed_stage('image_seo')
     def _analyze_image_seo(self, html, soup):
         """이미지 SEO 분석 (ALT 태그, 파일명 등)"""
         try:
@@ -686,6 +2766,7 @@ class NaverBlogCrawler:
         # 앞 4단어 반환
         return ' '.join(keywords[:4])
 
+    @timed_stage('search_exposure')
     def _check_search_exposure(self, blog_id, post_title, post_url):
         """네이버 검색에서 포스팅 노출 여부 확인 (키워드 기반) - 개선된 버전"""
         try:
@@ -701,58 +2782,31 @@ class NaverBlogCrawler:
             if not keyword:
                 return 'unknown', ''
 
-            # 키워드로 네이버 블로그 검색
-            search_query = urllib.parse.quote(keyword)
-            search_url = f'https://search.naver.com/search.naver?where=blog&query={search_query}'
-
-            response = requests.get(search_url, headers=self.headers, timeout=10)
-
-            if response.status_code != 200:
+            # 키워드로 네이버 블로그 검색 (SERP 캐시 공용)
+            serp = fetch_serp(keyword)
+            if serp is None:
                 return 'unknown', keyword
 
-            html = response.text
-            soup = BeautifulSoup(html, 'html.parser')
-
-            # ===== 개선된 노출 판단 로직 =====
-            # 검색 결과 항목들을 개별적으로 확인
-            search_items = soup.select('.api_txt_lines, .title_link, .total_tit, .sh_blog_title')
+            # 1순위: 정확한 포스팅 매칭 (blog_id + log_no) - 검색결과 전체 링크 기준
+            if log_no and f'{actual_blog_id}/{log_no}' in serp['posts']:
+                return 'indexed', keyword  # 정확한 포스팅이 노출됨
 
-            # 1순위: 정확한 포스팅 URL 매칭 (blog_id + log_no)
-            exact_match_patterns = [
-                f'{actual_blog_id}/{log_no}',
-                f'blogId={actual_blog_id}.*logNo={log_no}',
-                f'{actual_blog_id}.*{log_no}',
-            ]
-            for pattern in exact_match_patterns:
-                if re.search(pattern, html, re.IGNORECASE):
-                    return 'indexed', keyword  # 정확한 포스팅이 노출됨
-
-            # 2순위: 검색 결과에서 링크 직접 확인
-            all_links = soup.select('a[href*="blog.naver.com"]')
-            for link in all_links:
-                href = link.get('href', '')
-                if actual_blog_id in href and log_no in href:
-                    return 'indexed', keyword
-
-            # 3순위: 제목 유사도 확인 (같은 블로그의 다른 글이 노출된 경우와 구분)
+            # 2순위: 제목 유사도 확인 (같은 블로그의 다른 글이 노출된 경우와 구분)
             # 실제 포스팅 제목의 핵심 단어가 검색결과 제목에 포함되어 있는지 확인
             title_keywords = set(re.findall(r'[가-힣a-zA-Z0-9]{2,}', post_title))
-            if len(title_keywords) > 0:
-                for item in search_items:
-                    item_text = item.get_text(strip=True)
-                    # 검색결과 항목에서 블로그ID 확인
-                    parent_html = str(item.parent) if item.parent else ''
-                    if actual_blog_id in parent_html:
-                        # 제목 키워드 매칭 (50% 이상 일치시 해당 포스팅으로 판단)
-                        item_keywords = set(re.findall(r'[가-힣a-zA-Z0-9]{2,}', item_text))
-                        if len(title_keywords) > 0:
-                            match_ratio = len(title_keywords & item_keywords) / len(title_keywords)
-                            if match_ratio >= 0.5:
-                                return 'indexed', keyword
-
-            # 4순위: 블로그 ID만 검색결과에 있는 경우
+            if title_keywords:
+                for item in serp['items']:
+                    if item['blog_id'] != actual_blog_id:
+                        continue
+                    # 제목 키워드 매칭 (50% 이상 일치시 해당 포스팅으로 판단)
+                    item_keywords = set(re.findall(r'[가-힣a-zA-Z0-9]{2,}', item['title']))
+                    match_ratio = len(title_keywords & item_keywords) / len(title_keywords)
+                    if match_ratio >= 0.5:
+                        return 'indexed', keyword
+
+            # 3순위: 블로그 ID만 검색결과에 있는 경우
             # 다른 포스팅이 노출된 것일 수 있으므로 'pending'으로 표시
-            if actual_blog_id in html:
+            if actual_blog_id in serp['blog_ids']:
                 return 'pending', keyword  # 블로그는 검색되나 해당 글인지 불확실
 
             # 검색결과에 블로그 ID 자체가 없음
@@ -762,11 +2816,15 @@ class NaverBlogCrawler:
             print(f"Search check error: {e}")
             return 'unknown', ''
 
-    def _get_posts_with_index(self, blog_id, posts, max_posts=5):
-        """포스팅 목록에 지수 정보 추가 (병렬 처리) - 개선된 버전"""
+    @timed_stage('posts')
+    def _get_posts_with_index(self, blog_id, posts, max_posts=5, deadline=None):
+        """포스팅 목록에 지수 정보 추가 (병렬 처리) - (결과, 상태) 반환
+
+        deadline 안에 끝난 포스팅만 포함 (상태: ok / partial / timeout)
+        """
         enriched_posts = []
 
-        # 최대 5개 상세 분석 (메모리 최적화)
+        # 최대 max_posts개 상세 분석 (모드별 lite 0 / standard 5 / deep 10, 메모리 최적화)
         posts_to_analyze = posts[:max_posts]
 
         def analyze_post(post):
@@ -817,43 +2875,52 @@ class NaverBlogCrawler:
                 print(f"Individual post analysis error for {post_url}: {e}")
                 return default_result
 
-        # 병렬 처리 (최대 2개 동시 - 메모리 최적화)
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            futures = {executor.submit(analyze_post, post): post for post in posts_to_analyze}
-            for future in as_completed(futures):
-                try:
-                    result = future.result()
-                    enriched_posts.append(result)
-                except Exception as e:
-                    # 병렬 처리 실패시에도 기본 데이터로 추가
-                    original_post = futures[future]
-                    print(f"Post analysis future error: {e}")
-                    enriched_posts.append({
-                        **original_post,
-                        'likes': 0,
-                        'comments': 0,
-                        'images': 0,
-                        'exposure': 'unknown',
-                        'keyword': '',
-                        'char_count': 0,
-                        'word_count': 0,
-                        'subheading_count': 0,
-                        'link_count': 0,
-                        'has_video': False,
-                        'image_seo': {}
-                    })
+        # 병렬 처리 (최대 2개 동시 - 메모리 최적화), 작업마다 현재 컨텍스트(데드라인) 복사
+        executor = ThreadPoolExecutor(max_workers=2)
+        futures = {
+            executor.submit(contextvars.copy_context().run, analyze_post, post): post
+            for post in posts_to_analyze
+        }
+        done, not_done = wait(futures, timeout=deadline.remaining() if deadline else None)
+        # 시작 전 작업은 취소, 진행 중인 작업은 요청 timeout이 남은 시간으로 제한되어 곧 끝남 (기다리지 않음)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        for future in done:
+            try:
+                result = future.result()
+                enriched_posts.append(result)
+            except Exception as e:
+                # 병렬 처리 실패시에도 기본 데이터로 추가
+                original_post = futures[future]
+                print(f"Post analysis future error: {e}")
+                enriched_posts.append({
+                    **original_post,
+                    'likes': 0,
+                    'comments': 0,
+                    'images': 0,
+                    'exposure': 'unknown',
+                    'keyword': '',
+                    'char_count': 0,
+                    'word_count': 0,
+                    'subheading_count': 0,
+                    'link_count': 0,
+                    'has_video': False,
+                    'image_seo': {}
+                })
 
         # 원래 순서대로 정렬 (제목 기준)
         title_order = {post.get('title', ''): i for i, post in enumerate(posts_to_analyze)}
         enriched_posts.sort(key=lambda x: title_order.get(x.get('title', ''), 999))
 
-        return enriched_posts
+        status = 'ok' if not not_done else ('partial' if done else 'timeout')
+        return enriched_posts, status
 
+    @timed_stage('profile')
     def _crawl_profile(self, blog_id, result):
         """프로필 페이지 크롤링"""
         try:
             profile_url = f'https://blog.naver.com/profile/intro.naver?blogId={blog_id}'
-            response = requests.get(profile_url, headers=self.headers, timeout=10)
+            response = upstream_get(profile_url, headers=self.headers)
 
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, 'html.parser')
@@ -878,6 +2945,7 @@ class NaverBlogCrawler:
         except Exception as e:
             print(f"Profile crawl error: {e}")
 
+    @timed_stage('mobile_page')
     def _crawl_mobile_page(self, blog_id, result):
         """모바일 페이지 크롤링 - 이웃 수, 방문자 수, 프로필 이미지 가져오기"""
         try:
@@ -888,7 +2956,7 @@ class NaverBlogCrawler:
             }
 
             url = f'https://m.blog.naver.com/{blog_id}'
-            response = requests.get(url, headers=mobile_headers, timeout=10)
+            response = upstream_get(url, headers=mobile_headers)
 
             if response.status_code == 200:
                 html = response.text
@@ -1000,12 +3068,13 @@ class NaverBlogCrawler:
 
         return keyword_score
 
+    @timed_stage('visitor_stats')
     def _crawl_visitor_stats(self, blog_id, result):
         """방문자 통계 크롤링 (위젯 공개 시)"""
         try:
             # 방문자 카운터 API
             visitor_url = f'https://blog.naver.com/NVisitorg498Ajax.naver?blogId={blog_id}'
-            response = requests.get(visitor_url, headers=self.headers, timeout=10)
+            response = upstream_get(visitor_url, headers=self.headers)
 
             if response.status_code == 200:
                 # 오늘 방문자
@@ -1027,7 +3096,7 @@ class NaverBlogCrawler:
             if result.get('yesterday_visitors', 0) == 0:
                 try:
                     blog_url = f'https://blog.naver.com/prologue/PrologueList.naver?blogId={blog_id}'
-                    resp = requests.get(blog_url, headers=self.headers, timeout=10)
+                    resp = upstream_get(blog_url, headers=self.headers)
                     if resp.status_code == 200:
                         # 어제 방문자 패턴 찾기
                         yester_match = re.search(r'어제\s*(?:방문자?)?\s*[:：]?\s*(\d[\d,]*)', resp.text)
@@ -1039,6 +3108,17 @@ class NaverBlogCrawler:
         except Exception as e:
             print(f"Visitor stats crawl error: {e}")
     
+    def apply_index(self, result, weekly_avg=0, weekly_count=0):
+        """서버 7일 평균(3일 이상)으로 지수 계산 - 부족하면 전달받은 평균 사용"""
+        averages = result.get('visitor_averages') or {}
+        if averages.get('days_7d', 0) >= 3:
+            weekly_avg, weekly_count = averages['avg_7d'], averages['days_7d']
+
+        result['index'] = self._calculate_index(result, weekly_avg=weekly_avg, weekly_count=weekly_count)
+        result['weekly_avg_used'] = weekly_avg if weekly_count >= 2 else 0
+        result['weekly_count'] = weekly_count
+
+    @timed_stage('index')
     def _calculate_index(self, data, weekly_avg=0, weekly_count=0):
         """
         블로그 지수 계산 - 노출 중심
@@ -1253,8 +3333,140 @@ class NaverBlogCrawler:
 naver_crawler = NaverBlogCrawler()
 
 
+# 분석 모드 - 포스팅 상세 분석 개수와 시간 예산 (초, 넘기면 끝난 부분만 반환)
+# lite: 지수 배지용 (포스팅/검색 노출 분석 생략), standard: 기본, deep: 포스팅 더 많이
+ANALYSIS_MODES = {
+    'lite': {'max_posts': 0, 'deadline': CRAWL_DEADLINE / 2, 'target_ms': 1500},
+    'standard': {'max_posts': 5, 'deadline': CRAWL_DEADLINE, 'target_ms': 5000},
+    'deep': {'max_posts': 10, 'deadline': CRAWL_DEADLINE * 2, 'target_ms': 10000},
+}
+DEFAULT_ANALYSIS_MODE = 'standard'
+# 요청한 모드 대신 써도 되는 캐시 (상위 모드 결과는 하위 모드의 상위집합)
+ANALYSIS_MODE_FALLBACKS = {
+    'lite': ('lite', 'standard', 'deep'),
+    'standard': ('standard', 'deep'),
+    'deep': ('deep',),
+}
+
+def analysis_cache_key(blog_id, mode=DEFAULT_ANALYSIS_MODE):
+    """모드별 캐시 네임스페이스 (standard는 기존 키 그대로)"""
+    return blog_id if mode == DEFAULT_ANALYSIS_MODE else f'{mode}:{blog_id}'
+
+def get_cached_analysis(blog_id, mode=DEFAULT_ANALYSIS_MODE, max_stale=0):
+    """요청 모드 이상의 캐시 중 가장 신선한 것 - (결과, 경과 초, 모드), 없으면 (None, None, None)"""
+    best = (None, None, None)
+    for candidate in ANALYSIS_MODE_FALLBACKS[mode]:
+        data, age = get_cached_with_age(analysis_cache_key(blog_id, candidate), max_stale)
+        if data and (best[1] is None or age < best[1]):
+            best = (data, age, candidate)
+    cache_lookup('analysis', 'miss' if best[0] is None else ('stale' if best[1] >= cache_ttl(best[0]) else 'hit'))
+    return best
+
+def unavailable_result(blog_id, mode=DEFAULT_ANALYSIS_MODE):
+    """없는/비공개 블로그로 기록돼 있으면 에러 응답용 결과, 아니면 None"""
+    reason = get_unavailable(blog_id)
+    if reason:
+        return {
+            'blog_id': blog_id, 'error': UNAVAILABLE_MESSAGES[reason], 'unavailable': reason,
+            'platform': 'naver', 'from_cache': True, 'mode': mode
+        }
+    return None
+
+def crawl_and_cache(blog_id, mode=DEFAULT_ANALYSIS_MODE):
+    """블로그 크롤링 후 모드별 캐시에 저장 (에러 없는 경우 - 일부 단계가 빠진 결과는 PARTIAL_CACHE_TTL 동안만)
+
+    없는/비공개 블로그는 UNAVAILABLE_CACHE_TTL 동안 네이버 요청 없이 바로 에러 응답
+    """
+    cached = unavailable_result(blog_id, mode)
+    if cached:
+        return cached
+
+    settings = ANALYSIS_MODES[mode]
+    started = time.perf_counter()
+    result = naver_crawler.crawl(blog_id, max_posts=settings['max_posts'], deadline=Deadline(settings['deadline']))
+    elapsed_ms = int((time.perf_counter() - started) * 1000)
+    metrics.observe('blog_analyzer_analysis_seconds', elapsed_ms / 1000, mode=mode)
+    result['platform'] = 'naver'
+    result['from_cache'] = False
+    result['mode'] = mode
+    result['elapsed_ms'] = elapsed_ms
+
+    if elapsed_ms > settings['target_ms']:
+        metrics.inc('blog_analyzer_analysis_slow_total', mode=mode)
+        print(f"Analyze slow ({mode}, {blog_id}): {elapsed_ms}ms > target {settings['target_ms']}ms")
+    if result['partial']:
+        print(f"Analyze partial ({mode}, {blog_id}): {elapsed_ms}ms, stages={result['stages']}")
+
+    if result.get('unavailable'):
+        set_unavailable(blog_id, result['unavailable'])
+    elif not result.get('error'):
+        # partial 결과도 stages와 함께 저장 - 느린 업스트림에서도 캐시가 채워지고, 곧 만료돼 SWR/선제 갱신이 다시 크롤링
+        set_cache(analysis_cache_key(blog_id, mode), result)
+    return result
+
+
+# =====================================================
+# 인기 블로그 선제 갱신 (캐시 만료 전에 백그라운드 크롤링)
+# =====================================================
+REFRESH_CHECK_INTERVAL = 30  # 초
+REFRESH_TOP_N = int(os.environ.get('REFRESH_TOP_N', 10))
+REFRESH_AHEAD = 90  # 만료까지 남은 시간이 이보다 짧으면 갱신 (초)
+REFRESH_MIN_SCORE = 2.0  # 최소 인기도 (감쇠된 요청 수)
+POPULARITY_HALF_LIFE = 1800  # 인기도 반감기 (30분)
+# 선제 갱신에 쓸 수 있는 네이버 요청 수 (워커당, 분당) - 크롤링 1회 ≈ 메인 5 + 포스팅 5×2 + 여유 1
+REFRESH_UPSTREAM_BUDGET_PER_MIN = int(os.environ.get('REFRESH_UPSTREAM_BUDGET_PER_MIN', 30))
+CRAWL_UPSTREAM_COST = 16
+
+_popularity_lock = threading.Lock()
+_blog_popularity = {}  # blog_id -> (감쇠 점수, 마지막 갱신 시각)
+_refresh_budget = TokenBucket(REFRESH_UPSTREAM_BUDGET_PER_MIN)
+
+def _decayed(score, updated, now):
+    return score * 0.5 ** ((now - updated) / POPULARITY_HALF_LIFE)
+
+def record_blog_request(blog_id):
+    """블로그별 요청 빈도 기록 (지수 감쇠)"""
+    now = time.time()
+    with _popularity_lock:
+        score, updated = _blog_popularity.get(blog_id, (0.0, now))
+        _blog_popularity[blog_id] = (_decayed(score, updated, now) + 1, now)
+        # 오래되어 의미 없는 항목 정리
+        if len(_blog_popularity) > 1000:
+            for key, (sc, up) in list(_blog_popularity.items()):
+                if _decayed(sc, up, now) < 0.1:
+                    del _blog_popularity[key]
+    ensure_worker_thread('popular-refresher', _popular_refresh_loop)
+
+def get_popular_blogs(limit):
+    """인기도 상위 블로그 [(blog_id, score)]"""
+    now = time.time()
+    with _popularity_lock:
+        scored = [(blog_id, _decayed(score, updated, now)) for blog_id, (score, updated) in _blog_popularity.items()]
+    scored = [item for item in scored if item[1] >= REFRESH_MIN_SCORE]
+    return sorted(scored, key=lambda item: item[1], reverse=True)[:limit]
+
+def refresh_popular_blogs():
+    """만료가 임박한 인기 블로그를 예산 안에서 다시 크롤링"""
+    for blog_id, score in get_popular_blogs(REFRESH_TOP_N):
+        fresh_for = get_cache_fresh_for(blog_id)
+        if fresh_for is not None and fresh_for > REFRESH_AHEAD:
+            continue
+        if not _refresh_budget.take(CRAWL_UPSTREAM_COST):
+            break
+        try:
+            crawl_and_cache(blog_id)
+        except Exception as e:
+            print(f"Popular refresh error ({blog_id}): {e}")
+
+def _popular_refresh_loop():
+    while True:
+        time.sleep(REFRESH_CHECK_INTERVAL)
+        refresh_popular_blogs()
+
+
 # API 엔드포인트
 @app.route('/api/analyze', methods=['GET'])
+@admission_control('expensive')
 def analyze_blog():
     """블로그 분석 API - 네이버 블로그 전용"""
     blog_id = request.args.get('blog_id', '').strip()
@@ -1266,122 +3478,384 @@ def analyze_blog():
     if 'blog.naver.com' in blog_id:
         blog_id = blog_id.split('blog.naver.com/')[1].split('/')[0].split('?')[0]
 
-    # 주간 평균 파라미터 받기
+    # 클라이언트 주간 평균 (서버 시계열이 3일 미만일 때만 사용)
     weekly_avg = request.args.get('weekly_avg', type=int, default=0)
     weekly_count = request.args.get('weekly_count', type=int, default=0)
 
-    # 캐시 키 생성 (주간 평균이 다르면 다른 결과)
-    cache_key = f"{blog_id}_{weekly_avg}_{weekly_count}"
-
-    # 캐시 확인
-    cached_result = get_cached(cache_key)
-    if cached_result:
-        cached_result['from_cache'] = True
-        return jsonify(cached_result)
-
-    result = naver_crawler.crawl(blog_id, weekly_avg=weekly_avg, weekly_count=weekly_count)
-    result['platform'] = 'naver'
-    result['weekly_avg_used'] = weekly_avg if weekly_count >= 2 else 0
-    result['weekly_count'] = weekly_count
-    result['from_cache'] = False
+    # 분석 모드 (lite / standard / deep) - 모드별로 캐시가 분리됨 (주간 평균은 서버에서 계산)
+    mode = request.args.get('mode', DEFAULT_ANALYSIS_MODE).strip().lower()
+    if mode not in ANALYSIS_MODES:
+        return jsonify({'error': f"mode는 {', '.join(ANALYSIS_MODES)} 중 하나여야 합니다."}), 400
+
+    if mode == DEFAULT_ANALYSIS_MODE:
+        record_blog_request(blog_id)
+
+    # 단계별 소요 시간 추적 - Server-Timing 헤더로 항상 응답, debug=trace면 span 트리를 JSON에 포함
+    with start_trace('analyze') as trace:
+        # 캐시 확인 - 만료됐어도 max_stale 이내면 즉시 응답하고 백그라운드에서 갱신 (fresh=1이면 항상 새로 크롤링)
+        force_fresh = request.args.get('fresh', '') in ('1', 'true')
+        cached_result, cache_age, _ = (None, None, None) if force_fresh else get_cached_analysis(blog_id, mode, CACHE_MAX_STALE)
+        if cached_result:
+            result = {**cached_result, 'from_cache': True, 'cache_age': int(cache_age), 'stale': cache_age >= cache_ttl(cached_result)}
+            if result['stale']:
+                # 요청한 모드로 갱신 (상위 모드 캐시로 응답했어도 lite 요청이 deep 크롤링을 일으키지 않도록)
+                run_in_background(f'analyze:{analysis_cache_key(blog_id, mode)}', crawl_and_cache, blog_id, mode)
+        else:
+            # 캐시(부정 캐시 포함)로 답할 수 없을 때만 크롤링 슬롯 사용
+            result = unavailable_result(blog_id, mode)
+            if result is None:
+                wait = ANALYSIS_MODES[mode]['deadline']
+                with crawl_slot(wait) as admitted:
+                    if not admitted:
+                        return too_many_requests(wait, 'busy')
+                    result = crawl_and_cache(blog_id, mode)
+
+        # 서버 데이터가 부족하면 클라이언트 평균으로 지수만 다시 계산 (캐시된 원본은 유지)
+        if weekly_count >= 3 and result.get('visitor_averages', {}).get('days_7d', 0) < 3 and 'index' in result:
+            result = dict(result)
+            naver_crawler.apply_index(result, weekly_avg=weekly_avg, weekly_count=weekly_count)
+
+    if request.args.get('debug', '') == 'trace':
+        result = {**result, 'trace': trace.tree()}
+    response = jsonify(result)
+    response.headers['Server-Timing'] = trace.server_timing()
+    return response
+
+
+@app.route('/api/visitors/<blog_id>')
+@admission_control('cheap')
+def get_visitor_series(blog_id):
+    """블로그 일별 방문자 시계열 (최근 days일, 기본 30) + 7일/30일 평균"""
+    days = min(max(1, request.args.get('days', type=int, default=30)), SERIES_MAX_DAYS)
 
-    # 캐시에 저장 (에러가 없는 경우만)
-    if not result.get('error'):
-        set_cache(cache_key, result)
+    try:
+        series = load_visitor_series(blog_id)
+        today = _today_ordinal()
+        daily = [
+            {'date': datetime.fromordinal(day).date().isoformat(), 'visitors': series.get(day)}
+            for day in range(today - days + 1, today + 1)
+        ]
+        return jsonify({'success': True, 'blog_id': blog_id, 'daily': daily, **visitor_rollups(series, today)})
 
-    return jsonify(result)
+    except Exception as e:
+        print(f"Visitor series API error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @app.route('/api/health')
 def health_check():
-    """서버 상태 확인"""
-    return jsonify({'status': 'ok', 'timestamp': datetime.now().isoformat()})
+    """서버 상태 확인 (verbose=1이면 워커 시작 프로파일 + 네이버 엔드포인트별 브레이커/헤지 상태 포함)"""
+    response = {'status': 'ok', 'timestamp': datetime.now().isoformat()}
+    if request.args.get('verbose', '') in ('1', 'true'):
+        response['startup'] = {
+            'pid': os.getpid(),
+            'module_load_ms': MODULE_LOAD_MS,
+            'imports_ms': IMPORT_TIMINGS,
+            'loaded': [name for name in PRELOAD_MODULES if name in sys.modules]
+        }
+        response['upstream'] = upstream_states()
+    return jsonify(response)
+
+
+# 대기열/스레드 풀 상태 (수집 시점 값)
+metrics.gauge('blog_analyzer_upstream_in_use', '사용 중인 네이버 요청 슬롯', lambda: [({}, upstream_scheduler.in_use)])
+metrics.gauge('blog_analyzer_upstream_queue_depth', '네이버 요청 슬롯 대기 수 (우선순위별)', lambda: [
+    ({'priority': name}, depth) for name, depth in upstream_scheduler.snapshot()['waiting'].items()
+])
+metrics.gauge('blog_analyzer_hedge_pool_queue_depth', '헤지 요청 스레드 풀 대기 작업 수', lambda: [
+    ({}, _hedge_executor['executor']._work_queue.qsize() if _hedge_executor['pid'] == os.getpid() else 0)
+])
+metrics.gauge('blog_analyzer_admission_queue_depth', '무거운 API 동시 실행 대기 수', lambda: [({}, _expensive_waiting[0])])
+metrics.gauge('blog_analyzer_background_tasks', '실행 중인 백그라운드 작업 수', lambda: [({}, len(_background_running))])
+metrics.gauge('blog_analyzer_cache_entries', '메모리 캐시 항목 수', lambda: [
+    ({'cache': 'analysis'}, len(CACHE)), ({'cache': 'unavailable'}, len(UNAVAILABLE_CACHE))
+])
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """운영 지표 (Prometheus 텍스트 형식) - 모든 gunicorn 워커 합산"""
+    if METRICS_TOKEN and request.headers.get('Authorization', '') != f'Bearer {METRICS_TOKEN}':
+        return jsonify({'error': 'unauthorized'}), 401
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 
-@app.route('/api/trends')
-def get_trending_keywords():
-    """실시간 인기 검색어/트렌드 키워드 API (Google Trends + 네이버)"""
+# =====================================================
+# 운영 진단 (ADMIN_TOKEN 필요) - 샘플링 프로파일러, 메모리 스냅샷
+# - 요청을 받은 워커 프로세스 기준 (응답의 pid로 구분, 다른 워커는 다시 요청)
+# =====================================================
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+PROFILE_MAX_SECONDS = 30
+PROFILE_DEFAULT_INTERVAL_MS = 10
+PROFILE_IDLE_FILES = {'threading.py', 'selectors.py', 'socket.py', 'socketserver.py', 'queue.py', 'thread.py', 'ssl.py'}
+MEMORY_TRACE_FRAMES = 10
+
+_profiler_lock = threading.Lock()
+_memory_snapshots = {}  # 'last' -> 직전 tracemalloc 스냅샷 (diff용)
+
+def admin_required(view):
+    """ADMIN_TOKEN 확인 (Authorization: Bearer 또는 X-Admin-Token) - 미설정 시 엔드포인트 비활성"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({'error': 'not found'}), 404
+        auth = request.headers.get('Authorization', '')
+        token = auth[7:] if auth.startswith('Bearer ') else request.headers.get('X-Admin-Token', '')
+        if not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+            return jsonify({'error': 'unauthorized'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+def sample_stacks(seconds, interval, include_idle=False):
+    """모든 스레드 스택을 주기적으로 수집 - {접힌 스택 문자열: 샘플 수}"""
+    own = threading.get_ident()
+    names = {}
+    counts = {}
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread in threading.enumerate():
+            names[thread.ident] = thread.name
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            # 락/소켓 대기 중인 스레드 (가장 안쪽 프레임이 threading/selectors 등) 는 기본 제외
+            if not include_idle and os.path.basename(frame.f_code.co_filename) in PROFILE_IDLE_FILES:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                frame = frame.f_back
+            key = ';'.join([names.get(ident, str(ident))] + stack[::-1])
+            counts[key] = counts.get(key, 0) + 1
+        time.sleep(interval)
+    return counts
+
+@app.route('/admin/profile')
+@admin_required
+def admin_profile():
+    """CPU 샘플링 프로파일 (seconds초, 기본 5) - flamegraph.pl / speedscope용 접힌 스택 텍스트
+
+    interval_ms: 샘플 간격 (기본 10), idle=1: 대기 중인 스레드도 포함
+    """
+    seconds = min(max(request.args.get('seconds', type=float, default=5), 0.1), PROFILE_MAX_SECONDS)
+    interval = max(request.args.get('interval_ms', type=float, default=PROFILE_DEFAULT_INTERVAL_MS), 1) / 1000
+    include_idle = request.args.get('idle', '') in ('1', 'true')
+
+    if not _profiler_lock.acquire(blocking=False):
+        return jsonify({'error': '이미 프로파일링 중입니다.', 'pid': os.getpid()}), 409
     try:
-        trends = []
-
-        # 방법 1: Google Trends 관련 검색어 (인기 카테고리별)
-        try:
-            from pytrends.request import TrendReq
-            import random
-            pytrends = TrendReq(hl='ko', tz=540, timeout=(10, 25))
+        counts = sample_stacks(seconds, interval, include_idle)
+    finally:
+        _profiler_lock.release()
+
+    body = '\n'.join(f'{stack} {count}' for stack, count in sorted(counts.items(), key=lambda item: -item[1]))
+    response = Response(body + '\n', mimetype='text/plain')
+    response.headers['X-Worker-Pid'] = str(os.getpid())
+    return response
+
+@app.route('/admin/memory', methods=['GET', 'POST'])
+@admin_required
+def admin_memory():
+    """tracemalloc 메모리 스냅샷 (요청을 받은 워커 기준)
+
+    action=start: 추적 시작 / snapshot (기본): 상위 할당 위치 top개 (diff=1이면 직전 스냅샷 대비 증가분) / stop: 추적 중지
+    group_by: lineno (기본) / filename / traceback
+    """
+    action = request.args.get('action', 'snapshot')
+    top = min(max(request.args.get('top', type=int, default=20), 1), 200)
+    group_by = request.args.get('group_by', 'lineno')
+    if group_by not in ('lineno', 'filename', 'traceback'):
+        return jsonify({'error': 'group_by는 lineno, filename, traceback 중 하나여야 합니다.'}), 400
+
+    response = {'pid': os.getpid(), 'tracing': tracemalloc.is_tracing()}
+    if action == 'start':
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_TRACE_FRAMES)
+        _memory_snapshots.clear()
+        response['tracing'] = True
+        return jsonify(response)
+    if action == 'stop':
+        tracemalloc.stop()
+        _memory_snapshots.clear()
+        response['tracing'] = False
+        return jsonify(response)
+    if action != 'snapshot':
+        return jsonify({'error': 'action은 start, snapshot, stop 중 하나여야 합니다.'}), 400
+    if not tracemalloc.is_tracing():
+        return jsonify({**response, 'error': '추적 중이 아닙니다. action=start로 먼저 시작해주세요.'}), 409
+
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ))
+    previous = _memory_snapshots.get('last')
+    if request.args.get('diff', '') in ('1', 'true') and previous is not None:
+        stats = snapshot.compare_to(previous, group_by)[:top]
+        rows = [{
+            'size_kb': round(stat.size / 1024, 1), 'size_diff_kb': round(stat.size_diff / 1024, 1),
+            'count': stat.count, 'count_diff': stat.count_diff,
+            'traceback': [str(frame) for frame in stat.traceback]
+        } for stat in stats]
+    else:
+        rows = [{
+            'size_kb': round(stat.size / 1024, 1), 'count': stat.count,
+            'traceback': [str(frame) for frame in stat.traceback]
+        } for stat in snapshot.statistics(group_by)[:top]]
+    _memory_snapshots['last'] = snapshot
+
+    current, peak = tracemalloc.get_traced_memory()
+    return jsonify({**response, 'traced_kb': round(current / 1024, 1), 'peak_kb': round(peak / 1024, 1), 'top': rows})
 
-            # 블로그 인기 카테고리 키워드로 급상승 검색어 수집
-            seed_keywords = ['맛집', '여행', '카페', '다이어트', '인테리어']
-            random.shuffle(seed_keywords)
-
-            for seed in seed_keywords[:2]:  # 2개 카테고리만 사용 (속도)
-                try:
-                    pytrends.build_payload([seed], cat=0, timeframe='now 1-d', geo='KR')
-                    related = pytrends.related_queries()
-
-                    if seed in related and related[seed]['rising'] is not None:
-                        rising_df = related[seed]['rising']
-                        for _, row in rising_df.head(5).iterrows():
-                            keyword = row['query']
-                            if keyword not in [t['keyword'] for t in trends]:
-                                trends.append({
-                                    'keyword': keyword,
-                                    'category': seed,
-                                    'rank': len(trends) + 1,
-                                    'source': 'google'
-                                })
-                except:
-                    continue
 
-        except Exception as e:
-            print(f"Google Trends error: {e}")
+# =====================================================
+# 트렌드 키워드 (백그라운드 주기 갱신 + 마지막 정상 스냅샷 유지)
+# =====================================================
+TRENDS_SEED_KEYWORDS = ['맛집', '여행', '카페', '다이어트', '인테리어']
+TRENDS_PER_SEED = 3
+TRENDS_REFRESH_INTERVAL = 1800  # 30분
+TRENDS_RETRY_MIN = 60  # 스냅샷이 없을 때 재시도 간격 (실패할 때마다 2배, 최대 TRENDS_REFRESH_INTERVAL)
+TRENDS_CACHE_KEY = 'trends:snapshot'
+DEFAULT_TRENDS = [
+    {'keyword': '맛집 추천', 'category': '맛집', 'rank': 1, 'source': 'default'},
+    {'keyword': '여행 코스', 'category': '여행', 'rank': 2, 'source': 'default'},
+    {'keyword': '다이어트 식단', 'category': '건강', 'rank': 3, 'source': 'default'},
+    {'keyword': '주식 투자', 'category': '재테크', 'rank': 4, 'source': 'default'},
+    {'keyword': '인테리어 팁', 'category': '라이프', 'rank': 5, 'source': 'default'},
+    {'keyword': '육아 정보', 'category': '육아', 'rank': 6, 'source': 'default'},
+    {'keyword': '자기계발 책 추천', 'category': '도서', 'rank': 7, 'source': 'default'},
+    {'keyword': '운동 루틴', 'category': '운동', 'rank': 8, 'source': 'default'},
+    {'keyword': '카페 추천', 'category': '카페', 'rank': 9, 'source': 'default'},
+    {'keyword': '부업 방법', 'category': '재테크', 'rank': 10, 'source': 'default'},
+]
+
+_trends_lock = threading.Lock()
+_trends_snapshot = {'data': None, 'fetched_at': 0}
+
+def fetch_trends():
+    """Google Trends (전체 시드 카테고리) → 네이버 데이터랩 순으로 트렌드 수집"""
+    trends = []
+
+    # 방법 1: Google Trends 관련 검색어 (인기 카테고리별)
+    try:
+        TrendReq = timed_import('pytrends.request').TrendReq
+        pytrends = TrendReq(hl='ko', tz=540, timeout=(10, 25))
 
-        # 방법 2: 네이버 데이터랩 쇼핑 인사이트 (보조)
-        if len(trends) < 5:
+        for seed in TRENDS_SEED_KEYWORDS:
             try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                    'Accept': 'application/json',
-                }
-                shopping_url = 'https://datalab.naver.com/shoppingInsight/getKeywordRank.naver'
-                shopping_data = {'cid': 'ALL'}
-                resp = requests.post(shopping_url, data=shopping_data, headers=headers, timeout=5)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if 'result' in data:
-                        for idx, item in enumerate(data['result'][:10]):
+                pytrends.build_payload([seed], cat=0, timeframe='now 1-d', geo='KR')
+                related = pytrends.related_queries()
+
+                if seed in related and related[seed]['rising'] is not None:
+                    rising_df = related[seed]['rising']
+                    for _, row in rising_df.head(TRENDS_PER_SEED).iterrows():
+                        keyword = row['query']
+                        if keyword not in [t['keyword'] for t in trends]:
                             trends.append({
-                                'keyword': item.get('keyword', ''),
-                                'category': '쇼핑',
+                                'keyword': keyword,
+                                'category': seed,
                                 'rank': len(trends) + 1,
-                                'source': 'naver'
+                                'source': 'google'
                             })
-            except Exception as e:
-                print(f"Naver DataLab error: {e}")
-
-        # 방법 3: 기본 블로그 인기 키워드 (백업)
-        if len(trends) < 5:
-            blog_trends = [
-                {'keyword': '맛집 추천', 'category': '맛집', 'rank': 1, 'source': 'default'},
-                {'keyword': '여행 코스', 'category': '여행', 'rank': 2, 'source': 'default'},
-                {'keyword': '다이어트 식단', 'category': '건강', 'rank': 3, 'source': 'default'},
-                {'keyword': '주식 투자', 'category': '재테크', 'rank': 4, 'source': 'default'},
-                {'keyword': '인테리어 팁', 'category': '라이프', 'rank': 5, 'source': 'default'},
-                {'keyword': '육아 정보', 'category': '육아', 'rank': 6, 'source': 'default'},
-                {'keyword': '자기계발 책 추천', 'category': '도서', 'rank': 7, 'source': 'default'},
-                {'keyword': '운동 루틴', 'category': '운동', 'rank': 8, 'source': 'default'},
-                {'keyword': '카페 추천', 'category': '카페', 'rank': 9, 'source': 'default'},
-                {'keyword': '부업 방법', 'category': '재테크', 'rank': 10, 'source': 'default'},
-            ]
-            trends = blog_trends
+            except:
+                continue
+
+    except Exception as e:
+        print(f"Google Trends error: {e}")
+
+    # 방법 2: 네이버 데이터랩 쇼핑 인사이트 (보조)
+    if len(trends) < 5:
+        try:
+            headers = {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                'Accept': 'application/json',
+            }
+            shopping_url = 'https://datalab.naver.com/shoppingInsight/getKeywordRank.naver'
+            shopping_data = {'cid': 'ALL'}
+            resp = upstream_post(shopping_url, data=shopping_data, headers=headers, timeout=5)
+            if resp.status_code == 200:
+                data = resp.json()
+                if 'result' in data:
+                    for idx, item in enumerate(data['result'][:10]):
+                        trends.append({
+                            'keyword': item.get('keyword', ''),
+                            'category': '쇼핑',
+                            'rank': len(trends) + 1,
+                            'source': 'naver'
+                        })
+        except Exception as e:
+            print(f"Naver DataLab error: {e}")
+
+    return trends
+
+def refresh_trends():
+    """트렌드 스냅샷 갱신 - 수집 실패 시 기존 스냅샷 유지"""
+    # 다른 워커가 최근에 갱신했으면 디스크 스냅샷만 읽음
+    if crawl_disk_cache:
+        data, fetched_at = crawl_disk_cache.get(TRENDS_CACHE_KEY)
+        if data and time.time() - fetched_at < TRENDS_REFRESH_INTERVAL:
+            with _trends_lock:
+                if fetched_at > _trends_snapshot['fetched_at']:
+                    _trends_snapshot.update(data=data, fetched_at=fetched_at)
+            return
+
+    trends = fetch_trends()
+    if len(trends) < 5:
+        return
+
+    # 출처 정보 추가
+    data = {'trends': trends[:15], 'source': trends[0].get('source', 'default')}
+    fetched_at = time.time()
+    with _trends_lock:
+        _trends_snapshot.update(data=data, fetched_at=fetched_at)
+    if crawl_disk_cache:
+        crawl_disk_cache.set(TRENDS_CACHE_KEY, data, fetched_at)
+
+def _trends_refresh_loop():
+    retry = TRENDS_RETRY_MIN
+    while True:
+        refresh_trends()
+        if get_trends_snapshot()[0] is not None:
+            retry = TRENDS_RETRY_MIN
+            time.sleep(TRENDS_REFRESH_INTERVAL)
+        else:
+            # 아직 쓸 만한 스냅샷이 없음 - 기본 키워드로 응답 중이므로 빨리 재시도
+            time.sleep(retry)
+            retry = min(retry * 2, TRENDS_REFRESH_INTERVAL)
 
-        # 출처 정보 추가
-        source_info = 'google' if trends and trends[0].get('source') == 'google' else 'naver' if trends and trends[0].get('source') == 'naver' else 'default'
+def get_trends_snapshot():
+    """(스냅샷, 수집 시각) - 없으면 디스크에서 복원, 그래도 없으면 (None, 0)"""
+    with _trends_lock:
+        if _trends_snapshot['data'] is None and crawl_disk_cache:
+            data, fetched_at = crawl_disk_cache.get(TRENDS_CACHE_KEY)
+            if data:
+                _trends_snapshot.update(data=data, fetched_at=fetched_at)
+        return _trends_snapshot['data'], _trends_snapshot['fetched_at']
+
+
+@app.route('/api/trends')
+@admission_control('cheap')
+def get_trending_keywords():
+    """실시간 인기 검색어/트렌드 키워드 API (Google Trends + 네이버) - 백그라운드 스냅샷에서 즉시 응답"""
+    try:
+        ensure_worker_thread('trends-refresher', _trends_refresh_loop)
+
+        snapshot, fetched_at = get_trends_snapshot()
+        if snapshot is None:
+            # 첫 수집 전: 기본 블로그 인기 키워드 (백업) - 수집한 데이터가 아니므로 age 없음
+            return jsonify({
+                'trends': DEFAULT_TRENDS,
+                'updated': datetime.now().isoformat(),
+                'source': 'default',
+                'age': None,
+                'fallback': True
+            })
 
         return jsonify({
-            'trends': trends[:15],
-            'updated': datetime.now().isoformat(),
-            'source': source_info
+            'trends': snapshot['trends'],
+            'updated': datetime.fromtimestamp(fetched_at).isoformat(),
+            'source': snapshot['source'],
+            'age': int(time.time() - fetched_at)
         })
 
     except Exception as e:
@@ -1389,50 +3863,87 @@ def get_trending_keywords():
         return jsonify({'trends': [], 'error': str(e)})
 
 
+# 경쟁 블로그 비교 (상위 블로그 경량 크롤링 병렬 실행)
+COMPETITOR_MAX_TOP = 10
+COMPETITOR_MAX_PARALLEL = 3
+
+def get_lite_analysis(blog_id):
+    """경량 분석 (lite 모드) - 모든 모드의 캐시 재사용, (결과, 캐시 여부) 반환"""
+    cached, _, _ = get_cached_analysis(blog_id, 'lite')
+    if cached:
+        return cached, True
+    return crawl_and_cache(blog_id, 'lite'), False
+
+def build_comparison_row(blog_id, analysis, from_cache):
+    """비교표 한 줄 (지수, 방문자, 포스팅 지표)"""
+    index = analysis.get('index') or {}
+    posts = analysis.get('posts_with_index') or []
+    return {
+        'blog_id': blog_id,
+        'blog_name': analysis.get('blog_name') or analysis.get('blog_nickname'),
+        'index_score': index.get('score', 0),
+        'index_grade': index.get('grade', ''),
+        'daily_visitors': analysis.get('daily_visitors', 0),
+        'yesterday_visitors': analysis.get('yesterday_visitors', 0),
+        'total_visitors': analysis.get('total_visitors', 0),
+        'neighbors': analysis.get('neighbors', 0),
+        'total_posts': analysis.get('total_posts', 0),
+        'recent_30days_posts': analysis.get('recent_30days_posts', 0),
+        # 포스팅 상세 지표는 전체 분석 캐시가 있을 때만
+        'avg_likes': round(sum(p.get('likes', 0) for p in posts) / len(posts), 1) if posts else None,
+        'avg_comments': round(sum(p.get('comments', 0) for p in posts) / len(posts), 1) if posts else None,
+        'avg_char_count': round(sum(p.get('char_count', 0) for p in posts) / len(posts)) if posts else None,
+        'from_cache': from_cache,
+        'error': analysis.get('error')
+    }
+
+def compare_blogs(blog_ids):
+    """블로그 목록 병렬 경량 분석 - {blog_id: 비교표 행}"""
+    rows = {}
+
+    def analyze(blog_id):
+        try:
+            analysis, from_cache = get_lite_analysis(blog_id)
+            return build_comparison_row(blog_id, analysis, from_cache)
+        except Exception as e:
+            print(f"Competitor analysis error ({blog_id}): {e}")
+            return {'blog_id': blog_id, 'error': str(e)}
+
+    with ThreadPoolExecutor(max_workers=COMPETITOR_MAX_PARALLEL) as executor:
+        for blog_id, row in zip(blog_ids, executor.map(analyze, blog_ids)):
+            rows[blog_id] = row
+    return rows
+
+
 @app.route('/api/competitor')
+@admission_control('expensive')
 def analyze_competitor():
-    """경쟁 블로그 분석 API - 같은 키워드 상위 노출 블로그와 비교"""
+    """경쟁 블로그 분석 API - 같은 키워드 상위 노출 블로그와 비교
+
+    enrich=1: 상위 top개(기본 5, 최대 10) 블로그를 병렬 경량 분석하여 비교표(comparison) 포함
+    """
     keyword = request.args.get('keyword', '').strip()
     my_blog_id = request.args.get('blog_id', '').strip()
+    enrich = request.args.get('enrich', '') in ('1', 'true')
+    top = min(max(1, request.args.get('top', type=int, default=5)), COMPETITOR_MAX_TOP)
 
     if not keyword:
         return jsonify({'error': '키워드를 입력해주세요.'}), 400
 
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        }
-
-        # 네이버 블로그 검색
-        search_url = f'https://search.naver.com/search.naver?where=blog&query={urllib.parse.quote(keyword)}'
-        response = requests.get(search_url, headers=headers, timeout=10)
-
-        competitors = []
-
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # 검색 결과에서 상위 블로그 추출
-            blog_items = soup.select('.api_txt_lines.total_tit, .title_link')[:5]
+        # 네이버 블로그 검색 (노출 확인과 SERP 캐시 공용)
+        serp = fetch_serp(keyword)
 
-            for idx, item in enumerate(blog_items):
-                try:
-                    link = item.get('href', '')
-                    title = item.get_text(strip=True)
-
-                    # 블로그 ID 추출
-                    blog_id_match = re.search(r'blog\.naver\.com/([a-zA-Z0-9_-]+)', link)
-                    if blog_id_match:
-                        competitor_id = blog_id_match.group(1)
-                        competitors.append({
-                            'rank': idx + 1,
-                            'blog_id': competitor_id,
-                            'title': title[:50],
-                            'link': link,
-                            'is_mine': competitor_id == my_blog_id
-                        })
-                except:
-                    continue
+        competitors = [
+            {
+                'rank': item['rank'],
+                'blog_id': item['blog_id'],
+                'title': item['title'][:50],
+                'link': item['link'],
+                'is_mine': item['blog_id'] == my_blog_id
+            }
+            for item in (serp['items'] if serp else [])[:top if enrich else 5]
+        ]
 
         # 내 블로그 순위 확인
         my_rank = None
@@ -1441,12 +3952,30 @@ def analyze_competitor():
                 my_rank = comp['rank']
                 break
 
-        return jsonify({
+        response = {
             'keyword': keyword,
             'competitors': competitors,
             'my_rank': my_rank,
             'total_competitors': len(competitors)
-        })
+        }
+
+        if enrich:
+            # 순위 블로그 + 내 블로그 (중복 제거) 비교표
+            blog_ids = list(dict.fromkeys([comp['blog_id'] for comp in competitors] + ([my_blog_id] if my_blog_id else [])))
+            wait = ANALYSIS_MODES['lite']['deadline']
+            with crawl_slot(wait) as admitted:
+                if not admitted:
+                    return too_many_requests(wait, 'busy')
+                rows = compare_blogs(blog_ids)
+            ranks = {}
+            for comp in competitors:
+                ranks.setdefault(comp['blog_id'], comp['rank'])
+            response['comparison'] = [
+                {**rows[blog_id], 'rank': ranks.get(blog_id), 'is_mine': blog_id == my_blog_id}
+                for blog_id in blog_ids
+            ]
+
+        return jsonify(response)
 
     except Exception as e:
         print(f"Competitor API error: {e}")
@@ -1454,6 +3983,7 @@ def analyze_competitor():
 
 
 @app.route('/api/seo-score')
+@admission_control('expensive')
 def calculate_seo_score():
     """SEO 점수 계산 API"""
     blog_id = request.args.get('blog_id', '').strip()
@@ -1462,8 +3992,18 @@ def calculate_seo_score():
         return jsonify({'error': '블로그 ID를 입력해주세요.'}), 400
 
     try:
-        # 블로그 분석 결과 가져오기
-        result = naver_crawler.crawl(blog_id)
+        # 블로그 분석 결과 가져오기 (standard 이상 캐시 재사용, 없는/비공개 블로그는 네이버 요청 없이 응답)
+        result, _, _ = get_cached_analysis(blog_id)
+        if not result:
+            result = unavailable_result(blog_id)
+        if not result:
+            wait = ANALYSIS_MODES[DEFAULT_ANALYSIS_MODE]['deadline']
+            with crawl_slot(wait) as admitted:
+                if not admitted:
+                    return too_many_requests(wait, 'busy')
+                result = crawl_and_cache(blog_id)
+        if result.get('unavailable'):
+            return jsonify({'error': result['error'], 'unavailable': result['unavailable']})
 
         # SEO 점수 계산
         seo_score = {
@@ -1565,6 +4105,7 @@ def calculate_seo_score():
 
 
 @app.route('/api/suggest')
+@admission_control('cheap')
 def keyword_suggest():
     """네이버 연관 키워드 추천 API"""
     keyword = request.args.get('keyword', '').strip()
@@ -1581,7 +4122,7 @@ def keyword_suggest():
             'Accept': 'application/json',
         }
 
-        response = requests.get(suggest_url, headers=headers, timeout=5)
+        response = upstream_get(suggest_url, headers=headers, timeout=5)
 
         if response.status_code == 200:
             data = response.json()
@@ -1608,9 +4149,10 @@ def keyword_suggest():
 # ============ Supabase DB API ============
 
 @app.route('/api/history/save', methods=['POST'])
+@admission_control('cheap')
 def save_analysis_history():
-    """분석 결과를 Supabase에 저장"""
-    if not SUPABASE_KEY:
+    """분석 결과를 DB에 저장"""
+    if not storage.available():
         return jsonify({'success': False, 'error': 'DB 연결 안됨'}), 500
 
     try:
@@ -1631,14 +4173,14 @@ def save_analysis_history():
             'index_score': analysis_data.get('index', {}).get('score', 0),
             'index_grade': analysis_data.get('index', {}).get('grade', ''),
             'analyzed_at': datetime.now().isoformat(),
-            'full_data': json.dumps(analysis_data, ensure_ascii=False)
+            'full_data': encode_history_payload(analysis_data)
         }
 
-        # Supabase REST API로 저장
-        result = supabase_request('POST', 'blog_history', data=record)
+        result = storage.save_history(record)
 
         if result:
-            return jsonify({'success': True, 'data': result})
+            record_history_saved(blog_id)
+            return jsonify({'success': True, 'data': [result]})
         else:
             return jsonify({'success': False, 'error': 'DB 저장 실패'}), 500
 
@@ -1648,22 +4190,24 @@ def save_analysis_history():
 
 
 @app.route('/api/history/<blog_id>')
+@admission_control('cheap')
 def get_analysis_history(blog_id):
-    """특정 블로그의 분석 히스토리 조회"""
-    if not SUPABASE_KEY:
+    """특정 블로그의 분석 히스토리 조회 (기본: 시계열 필드만, full=1이면 전체 분석 데이터 포함)"""
+    if not storage.available():
         return jsonify({'success': False, 'error': 'DB 연결 안됨', 'history': []}), 500
 
     try:
+        include_full = request.args.get('full', '') in ('1', 'true')
+
         # 최근 30일 데이터 조회
-        params = {
-            'select': '*',
-            'blog_id': f'eq.{blog_id}',
-            'order': 'analyzed_at.desc',
-            'limit': '30'
-        }
-        result = supabase_request('GET', 'blog_history', params=params)
+        fields = HISTORY_SERIES_FIELDS + ('full_data',) if include_full else HISTORY_SERIES_FIELDS
+        result = storage.get_history(blog_id, limit=30, fields=fields) or []
+
+        if include_full:
+            for row in result:
+                row['full_data'] = decode_history_payload(blog_id, row.get('full_data'))
 
-        return jsonify({'success': True, 'history': result or []})
+        return jsonify({'success': True, 'history': result})
 
     except Exception as e:
         print(f"Get history error: {e}")
@@ -1671,29 +4215,28 @@ def get_analysis_history(blog_id):
 
 
 @app.route('/api/history/recent')
+@admission_control('cheap')
 def get_recent_blogs():
-    """최근 분석된 블로그 목록 조회"""
-    if not SUPABASE_KEY:
+    """최근 분석된 블로그 목록 조회 (limit: 기본 10, 최대 100)"""
+    if not storage.available():
         return jsonify({'success': False, 'error': 'DB 연결 안됨', 'blogs': []}), 500
 
     try:
-        # 최근 분석된 블로그 (중복 제거, 최신순)
-        params = {
-            'select': 'blog_id,blog_name,index_grade,daily_visitors,analyzed_at',
-            'order': 'analyzed_at.desc',
-            'limit': '50'
-        }
-        result = supabase_request('GET', 'blog_history', params=params)
-
-        # 블로그 ID별 최신 데이터만 추출
-        seen = set()
-        unique_blogs = []
-        for item in (result or []):
-            if item['blog_id'] not in seen:
-                seen.add(item['blog_id'])
-                unique_blogs.append(item)
-                if len(unique_blogs) >= 10:
-                    break
+        limit = min(max(1, request.args.get('limit', type=int, default=10)), RECENT_BLOGS_MAX_LIMIT)
+
+        # 블로그별 최신 분석 테이블에서 바로 조회 (최신순)
+        unique_blogs = storage.recent_blogs(limit=limit)
+
+        if unique_blogs is None:
+            # blog_latest 미생성 환경: 원본 히스토리에서 중복 제거
+            seen = set()
+            unique_blogs = []
+            for item in (storage.recent_history(limit=limit * 5) or []):
+                if item['blog_id'] not in seen:
+                    seen.add(item['blog_id'])
+                    unique_blogs.append(item)
+                    if len(unique_blogs) >= limit:
+                        break
 
         return jsonify({'success': True, 'blogs': unique_blogs})
 
@@ -1703,27 +4246,23 @@ def get_recent_blogs():
 
 
 @app.route('/api/stats/total')
+@admission_control('cheap')
 def get_total_stats():
     """전체 분석 통계 조회 (총 분석 수, 고유 블로그 수)"""
-    if not SUPABASE_KEY:
+    if not storage.available():
         return jsonify({'success': False, 'total_analyses': 0, 'unique_blogs': 0, 'db_connected': False})
 
     try:
-        # 전체 분석 횟수 조회
-        params = {
-            'select': 'id,blog_id',
-            'limit': '10000'
-        }
-        result = supabase_request('GET', 'blog_history', params=params)
-        total_analyses = len(result) if result else 0
-
-        # 고유 블로그 수 계산
-        unique_blogs = len(set(item.get('blog_id', '') for item in (result or []) if item.get('blog_id')))
+        # 메모리 스냅샷에서 바로 응답 (갱신은 백그라운드에서 증분 처리)
+        stats = get_total_stats_snapshot()
 
         return jsonify({
             'success': True,
-            'total_analyses': total_analyses,
-            'unique_blogs': unique_blogs,
+            'total_analyses': stats['total_analyses'],
+            'unique_blogs': stats['unique_blogs'],
+            'approximate': stats['approximate'],
+            'scan_complete': stats['scan_complete'],
+            'updated_at': stats['updated_at'],
             'db_connected': True
         })
 
@@ -1736,44 +4275,126 @@ def get_total_stats():
 # 커뮤니티 API
 # =====================================================
 
-@app.route('/api/community/posts', methods=['GET'])
-def get_community_posts():
-    """커뮤니티 게시글 목록 조회"""
-    if not SUPABASE_KEY:
-        return jsonify({'success': False, 'posts': [], 'total': 0, 'page': 1})
+# 게시글 수 캐시 (카테고리별) - 만료 전에는 목록 조회 시 count 계산 생략
+COMMUNITY_COUNT_TTL = 60  # 1분
+COMMUNITY_COUNT_MODE = os.environ.get('COMMUNITY_COUNT_MODE', 'exact')  # exact | planned | estimated
+COMMUNITY_MAX_LIMIT = 50
+_community_counts = {}
+_community_counts_lock = threading.Lock()
+
+def get_cached_post_count(category):
+    """캐시된 게시글 수 (만료 시 None)"""
+    with _community_counts_lock:
+        cached = _community_counts.get(category)
+    if cached and time.time() - cached[1] < COMMUNITY_COUNT_TTL:
+        return cached[0]
+    return None
 
+def set_cached_post_count(category, total):
+    with _community_counts_lock:
+        _community_counts[category] = (total, time.time())
+
+def bump_cached_post_count(category, delta=1):
+    """게시글 작성 시 전체/해당 카테고리 개수 즉시 반영"""
+    with _community_counts_lock:
+        for key in ('all', category):
+            if key in _community_counts:
+                total, cached_at = _community_counts[key]
+                _community_counts[key] = (total + delta, cached_at)
+
+def encode_post_cursor(post):
+    """keyset 커서 생성 (created_at, id)"""
+    raw = json.dumps([post.get('created_at'), post.get('id')])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_post_cursor(cursor):
+    """keyset 커서 해석 - 잘못된 커서면 None"""
     try:
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 10))
-        category = request.args.get('category', '')
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, post_id = json.loads(base64.urlsafe_b64decode(padded).decode('utf-8'))
+        if not created_at or not isinstance(post_id, int):
+            return None
+        return created_at, post_id
+    except Exception:
+        return None
 
-        offset = (page - 1) * limit
 
-        # 게시글 조회
-        params = {
-            'select': '*',
-            'order': 'created_at.desc',
-            'offset': str(offset),
-            'limit': str(limit)
-        }
+# 게시판 읽기 캐시 (목록: 카테고리/페이지별, 상세: 게시글별)
+community_list_cache = SWRCache('community_list', fresh_ttl=10, stale_ttl=300)
+community_post_cache = SWRCache('community_post', fresh_ttl=30, stale_ttl=600, max_entries=500)
 
-        if category and category != 'all':
-            params['category'] = f'eq.{category}'
+def _load_community_page(category, page, limit, cursor_key):
+    """게시글 목록 한 페이지 조회 - 실패 시 None"""
+    # 전체 개수: 캐시가 유효하면 생략, 아니면 같은 요청에서 함께 받음
+    total = get_cached_post_count(category)
+    result, counted = storage.list_posts(
+        category, limit, offset=(page - 1) * limit, cursor=cursor_key,
+        count=None if total is not None else COMMUNITY_COUNT_MODE
+    )
+    if counted is not None:
+        total = counted
+        set_cached_post_count(category, total)
+
+    if result is None:
+        return None
+
+    return {
+        'posts': result,
+        'total': total or 0,
+        'next_cursor': encode_post_cursor(result[-1]) if len(result) == limit else None
+    }
+
+def _load_community_post(post_id):
+    """게시글 상세 조회 - 없거나 실패 시 None"""
+    post = storage.get_post(post_id)
+    if post:
+        remember_post_likes(post_id, post.get('likes') or 0)
+    return post
 
-        result = supabase_request('GET', 'community_posts', params=params)
+def apply_cached_likes(post_id, likes):
+    """캐시된 목록/상세의 좋아요 수를 새 값으로 교체"""
+    def patch_post(post):
+        return {**post, 'likes': likes} if post.get('id') == post_id else post
+
+    community_post_cache.update_values(
+        lambda key, post: patch_post(post) if key == post_id else None
+    )
+    community_list_cache.update_values(
+        lambda key, page: {**page, 'posts': [patch_post(p) for p in page['posts']]}
+        if any(p.get('id') == post_id for p in page['posts']) else None
+    )
+
+
+@app.route('/api/community/posts', methods=['GET'])
+@admission_control('cheap')
+def get_community_posts():
+    """커뮤니티 게시글 목록 조회 (page 또는 cursor 기반)"""
+    if not storage.available():
+        return jsonify({'success': False, 'posts': [], 'total': 0, 'page': 1})
 
-        # 전체 개수 조회
-        count_params = {'select': 'id'}
-        if category and category != 'all':
-            count_params['category'] = f'eq.{category}'
-        count_result = supabase_request('GET', 'community_posts', params=count_params)
-        total = len(count_result) if count_result else 0
+    try:
+        page = max(1, int(request.args.get('page', 1)))
+        limit = min(max(1, int(request.args.get('limit', 10))), COMMUNITY_MAX_LIMIT)
+        category = request.args.get('category', '') or 'all'
+        cursor = request.args.get('cursor', '').strip()
+
+        cursor_key = None
+        if cursor:
+            cursor_key = decode_post_cursor(cursor)
+            if not cursor_key:
+                return jsonify({'success': False, 'posts': [], 'total': 0, 'page': page, 'error': '잘못된 커서입니다.'}), 400
+
+        cache_key = (category, limit, cursor_key or page)
+        data = community_list_cache.get(
+            cache_key, lambda: _load_community_page(category, page, limit, cursor_key)
+        ) or {'posts': [], 'total': 0, 'next_cursor': None}
 
         return jsonify({
             'success': True,
-            'posts': result or [],
-            'total': total,
-            'page': page
+            'posts': data['posts'],
+            'total': data['total'],
+            'page': page,
+            'next_cursor': data['next_cursor']
         })
 
     except Exception as e:
@@ -1782,9 +4403,10 @@ def get_community_posts():
 
 
 @app.route('/api/community/posts', methods=['POST'])
+@admission_control('cheap')
 def create_community_post():
     """커뮤니티 게시글 작성"""
-    if not SUPABASE_KEY:
+    if not storage.available():
         return jsonify({'success': False, 'error': 'DB 연결 안됨'})
 
     try:
@@ -1807,10 +4429,12 @@ def create_community_post():
             'comments': 0
         }
 
-        result = supabase_request('POST', 'community_posts', data=post_data)
+        result = storage.create_post(post_data)
 
         if result:
-            return jsonify({'success': True, 'post': result[0] if isinstance(result, list) else result})
+            bump_cached_post_count(category)
+            community_list_cache.invalidate()
+            return jsonify({'success': True, 'post': result})
         else:
             return jsonify({'success': False, 'error': '게시글 저장 실패'})
 
@@ -1820,20 +4444,17 @@ def create_community_post():
 
 
 @app.route('/api/community/posts/<int:post_id>')
+@admission_control('cheap')
 def get_community_post(post_id):
     """커뮤니티 게시글 상세 조회"""
-    if not SUPABASE_KEY:
+    if not storage.available():
         return jsonify({'success': False, 'error': 'DB 연결 안됨'})
 
     try:
-        params = {
-            'select': '*',
-            'id': f'eq.{post_id}'
-        }
-        result = supabase_request('GET', 'community_posts', params=params)
+        post = community_post_cache.get(post_id, lambda: _load_community_post(post_id))
 
-        if result and len(result) > 0:
-            return jsonify({'success': True, 'post': result[0]})
+        if post:
+            return jsonify({'success': True, 'post': post})
         else:
             return jsonify({'success': False, 'error': '게시글을 찾을 수 없습니다.'})
 
@@ -1842,23 +4463,97 @@ def get_community_post(post_id):
         return jsonify({'success': False, 'error': str(e)})
 
 
+# 좋아요 누적기 - 게시글별로 모아서 주기적으로 한 번에 반영
+LIKE_FLUSH_INTERVAL = 2  # 초
+LIKE_CAS_RETRIES = 3
+
+_likes_lock = threading.Lock()
+_pending_likes = {}  # post_id -> 아직 DB에 반영되지 않은 증가분
+_inflight_likes = {}  # post_id -> 반영 중인 증가분
+_known_likes = {}    # post_id -> 마지막으로 확인된 DB 좋아요 수
+_like_flush_wakeup = threading.Event()
+
+def _apply_like_delta(post_id, delta):
+    """누적 증가분을 원자적으로 반영 - 반영된 값 반환 (게시글 없으면 None)"""
+    with _likes_lock:
+        expected = _known_likes.get(post_id)
+    return storage.increment_post_likes(post_id, delta, expected=expected)
+
+def flush_pending_likes():
+    """누적된 좋아요를 게시글당 1회 쓰기로 반영"""
+    with _likes_lock:
+        batch = dict(_pending_likes)
+        _pending_likes.clear()
+        _inflight_likes.update(batch)
+
+    for post_id, delta in batch.items():
+        try:
+            likes = _apply_like_delta(post_id, delta)
+            with _likes_lock:
+                _inflight_likes.pop(post_id, None)
+                if likes is None:
+                    _known_likes.pop(post_id, None)
+                else:
+                    _known_likes[post_id] = likes
+        except Exception as e:
+            print(f"Like flush error: {e}")
+            # 실패한 증가분은 다음 주기에 다시 시도
+            with _likes_lock:
+                _inflight_likes.pop(post_id, None)
+                _pending_likes[post_id] = _pending_likes.get(post_id, 0) + delta
+
+def _like_flush_loop():
+    wakeup = _like_flush_wakeup
+    while True:
+        wakeup.wait()
+        wakeup.clear()
+        time.sleep(LIKE_FLUSH_INTERVAL)  # 그 사이의 클릭을 모아서 한 번에 반영
+        flush_pending_likes()
+        with _likes_lock:
+            if _pending_likes:
+                wakeup.set()
+
+def remember_post_likes(post_id, likes):
+    """조회로 확인한 좋아요 수 기록 (반영 대기 중인 증가분이 없을 때만)"""
+    with _likes_lock:
+        if post_id not in _pending_likes and post_id not in _inflight_likes:
+            _known_likes[post_id] = likes
+
+def add_post_like(post_id):
+    """좋아요 1 증가 예약 - 낙관적 좋아요 수 반환 (게시글 없으면 None)"""
+    with _likes_lock:
+        base = _known_likes.get(post_id)
+    if base is None:
+        base = storage.get_post_likes(post_id)
+        if base is None:
+            return None
+
+    with _likes_lock:
+        _known_likes.setdefault(post_id, base)
+        _pending_likes[post_id] = _pending_likes.get(post_id, 0) + 1
+        optimistic = _known_likes[post_id] + _inflight_likes.get(post_id, 0) + _pending_likes[post_id]
+
+    ensure_worker_thread('like-flusher', _like_flush_loop)
+    _like_flush_wakeup.set()
+    return optimistic
+
+atexit.register(flush_pending_likes)
+atexit.register(metrics.flush)
+
+
 @app.route('/api/community/posts/<int:post_id>/like', methods=['POST'])
+@admission_control('cheap')
 def like_community_post(post_id):
     """커뮤니티 게시글 좋아요"""
-    if not SUPABASE_KEY:
+    if not storage.available():
         return jsonify({'success': False, 'error': 'DB 연결 안됨'})
 
     try:
-        # 현재 좋아요 수 조회
-        params = {'select': 'likes', 'id': f'eq.{post_id}'}
-        result = supabase_request('GET', 'community_posts', params=params)
-
-        if result and len(result) > 0:
-            current_likes = result[0].get('likes', 0)
-            # 좋아요 증가
-            update_data = {'likes': current_likes + 1}
-            supabase_request('PATCH', f'community_posts?id=eq.{post_id}', data=update_data)
-            return jsonify({'success': True, 'likes': current_likes + 1})
+        likes = add_post_like(post_id)
+
+        if likes is not None:
+            apply_cached_likes(post_id, likes)
+            return jsonify({'success': True, 'likes': likes})
         else:
             return jsonify({'success': False, 'error': '게시글을 찾을 수 없습니다.'})
 
@@ -8770,7 +11465,7 @@ def index():
                 <div class="loading">
                     <div class="spinner"></div>
                     <p>블로그 데이터를 분석하고 있습니다...</p>
-                    <p style="font-size: 12px; color: #ffffff66; margin-top: 8px;">포스팅 지수 분석 중 (약 1분~1분 30초 소요)</p>
+                    <p style="font-size: 12px; color: #ffffff66; margin-top: 8px;">포스팅 지수 분석 중 (최대 10초 정도 소요)</p>
                 </div>
             `;
 
@@ -10957,6 +13652,10 @@ def index():
 '''
 
 
+# 모듈 로드 시간 (지연 로딩 대상 제외)
+MODULE_LOAD_MS = round((time.perf_counter() - _MODULE_LOAD_STARTED) * 1000, 1)
+
+
 if __name__ == '__main__':
     print("=" * 50)
     print("🚀 블로그 지수 분석기 서버 시작!")
@@ -0,0 +1,28 @@
+"""
+gunicorn 설정 (Procfile / render.yaml 실행 명령의 옵션이 우선 적용됨)
+
+앱과 무거운 의존성(requests, bs4, pytrends/pandas)을 마스터에서 미리 import하고
+워커는 fork로 메모리를 공유(copy-on-write)하여 워커 부팅과 첫 요청 지연을 줄입니다.
+앱 모듈은 import 시점에 스레드나 DB 연결을 만들지 않으므로 preload해도 안전합니다.
+"""
+
+preload_app = True
+
+
+def on_starting(server):
+    """마스터 시작 - 이전 실행의 워커별 지표 파일 정리 (/metrics 합산 대상)"""
+    import blog_analyzer_server
+
+    blog_analyzer_server.reset_metrics_dir()
+
+
+def when_ready(server):
+    """마스터 준비 완료 - 워커 fork 전에 무거운 모듈 로드"""
+    import blog_analyzer_server
+
+    blog_analyzer_server.preload_heavy_modules()
+    server.log.info(
+        "Preloaded modules (ms): %s, app module load: %sms",
+        blog_analyzer_server.IMPORT_TIMINGS,
+        blog_analyzer_server.MODULE_LOAD_MS,
+    )